@@ -4,34 +4,45 @@ from fu import FunctionalUnit
 
 class ALU(FunctionalUnit): 
 
-    def __init__(self):  
-        super().__init__("alu",1)
+    def __init__(self, clocks=1):  
+        super().__init__("alu",clocks)
         self.zero_flag = False
 
-    def execute(self, opcode: str, val1: int, val2: int = 0, val3: int = 0):
-        self.clocks -= 1
-        try:
-            if opcode == "ADD":
-                return val1 + val2
-            elif opcode == "SUB":
-                return val1 - val2
-            elif opcode == "AND":
-                return val1 & val2
-            elif opcode == "OR":
-                return val1 | val2
-            elif opcode == "XOR":
-                return val1 ^ val2
-            elif opcode == "SHRL":
-                return val1 >> val2
-            elif opcode == "SHLL":
-                return val1 << val2
-            elif opcode == "LOOP":
-                if val2 == 0:
-                    self.zero_flag = True
-                    return val3
-                else:
-                    self.zero_flag = False           
-            else:
-                return 0, f"Opcode no soportado: {opcode}"
-        except Exception as e:
-            return 0, f"Error de ejecución: {str(e)}"
\ No newline at end of file
+    def add(self, val1: int, val2: int = 0, val3: int = 0):
+        return val1 + val2
+
+    def sub(self, val1: int, val2: int = 0, val3: int = 0):
+        return val1 - val2
+
+    def and_(self, val1: int, val2: int = 0, val3: int = 0):
+        return val1 & val2
+
+    def or_(self, val1: int, val2: int = 0, val3: int = 0):
+        return val1 | val2
+
+    def xor(self, val1: int, val2: int = 0, val3: int = 0):
+        return val1 ^ val2
+
+    def shrl(self, val1: int, val2: int = 0, val3: int = 0):
+        return val1 >> val2
+
+    def shll(self, val1: int, val2: int = 0, val3: int = 0):
+        return val1 << val2
+
+    def loop(self, val1: int, val2: int = 0, val3: int = 0):
+        if val2 == 0:
+            self.zero_flag = True
+            return val3
+        else:
+            self.zero_flag = False
+
+    operations = {
+        "ADD": add,
+        "SUB": sub,
+        "AND": and_,
+        "OR": or_,
+        "XOR": xor,
+        "SHRL": shrl,
+        "SHLL": shll,
+        "LOOP": loop,
+    }
@@ -0,0 +1,299 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from Pipeline import Pipeline_marcador
+from Profiler import StageProfiler
+from traductor import ensamblar, ensamblar_fuente
+
+try:
+    import resource
+except ImportError:  # Windows: sin pico de memoria
+    resource = None
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Archivo de historial por defecto
+HISTORY_FILE = "bench_history.json"
+
+# Caída de ticks/s (fracción) a partir de la cual compare marca una regresión
+REGRESSION_THRESHOLD = 0.05
+
+# Bytes de datos de entrada para los programas de encriptación
+DATA_BYTES = 400
+
+# Kernels sintéticos: cada uno concentra un tipo de riesgo del scoreboard
+KERNELS = {
+    # Cadena de dependencias RAW: cada instrucción espera a la anterior
+    "raw_chain": """
+ADD R14, R0, 200
+_inicio:
+ADD R1, R1, 1
+ADD R2, R1, R1
+XOR R3, R2, R1
+SHLL R4, R3, 1
+SUB R5, R4, R3
+OR R1, R5, R2
+SUB R14, R14, 1
+LOOP R14, _fin
+LOOP R0, _inicio
+_fin:
+ADD R1, R1, R0
+""",
+    # Reuso de R8-R12 como en los ciclos de TEA: riesgos WAW y WAR
+    "waw_war": """
+ADD R14, R0, 200
+_inicio:
+ADD R8, R1, 3
+ADD R9, R8, R2
+ADD R8, R2, 5
+XOR R10, R8, R9
+ADD R9, R10, 1
+AND R11, R9, R8
+ADD R10, R11, R10
+OR R12, R10, R9
+ADD R11, R12, 7
+SUB R14, R14, 1
+LOOP R14, _fin
+LOOP R0, _inicio
+_fin:
+ADD R1, R1, R0
+""",
+    # Muchas instrucciones para pocas unidades (SAXS y MULT únicas)
+    "structural": """
+ADD R14, R0, 200
+ADD R2, R0, 3
+_inicio:
+SAXS R3, R2, R0
+MUL R4, R2, R2
+SAXS R5, R2, R0
+MUL R6, R2, 5
+SAXS R7, R4, R0
+MUL R8, R6, R2
+SUB R14, R14, 1
+LOOP R14, _fin
+LOOP R0, _inicio
+_fin:
+ADD R1, R1, R0
+""",
+    # Accesos a memoria dependientes entre sí
+    "memory": """
+ADD R14, R0, 200
+ADD R5, R0, 8
+_inicio:
+STOR R14, R5, R0
+LOAD R6, R5, R0
+ADD R5, R5, 1
+STOR R6, R5, R0
+LOAD R7, R5, R0
+ADD R7, R7, 1
+SUB R14, R14, 1
+LOOP R14, _fin
+LOOP R0, _inicio
+_fin:
+ADD R1, R1, R0
+""",
+    # Ciclo corto: domina la espera de los saltos
+    "branch": """
+ADD R14, R0, 250
+_inicio:
+ADD R1, R1, 1
+SUB R14, R14, 1
+LOOP R14, _fin
+LOOP R0, _inicio
+_fin:
+ADD R1, R1, R0
+""",
+}
+
+# Programas del proyecto que se miden junto a los kernels
+PROGRAMS = {
+    "encriptar": "Encriptación.txt",
+    "desencriptar": "Desencriptar.txt",
+}
+
+def peak_rss_kb():
+    """Pico de memoria residente del proceso en KB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+def measure(name, program, data, key, repeat, event_driven, profile_dir=None):
+    """
+    Corre un caso en el proceso actual: el mejor tiempo de repeat corridas
+    temporizadas y la cantidad de instrucciones de una corrida funcional.
+    Con profile_dir, una corrida más con StageProfiler escribe name.folded
+    """
+    functional = Pipeline_marcador(program, data, key, functional=True)
+    functional.run()
+    instructions = functional.clock - 1
+
+    best = None
+    for _ in range(repeat):
+        sb = Pipeline_marcador(program, data, key, event_driven=event_driven)
+        ticks = 0
+        start = time.perf_counter()
+        while not sb.done():
+            sb.tick()
+            ticks += 1
+        seconds = time.perf_counter() - start
+        if best is None or seconds < best[0]:
+            best = (seconds, ticks, sb.clock - 1)
+
+    if profile_dir is not None:
+        sb = Pipeline_marcador(program, data, key, event_driven=event_driven)
+        profiler = StageProfiler(sb).attach()
+        sb.run()
+        profiler.dump(os.path.join(profile_dir, name + ".folded"), prefix=name)
+
+    seconds, ticks, cycles = best
+    return {
+        "name": name,
+        "cycles": cycles,
+        "ticks": ticks,
+        "instructions": instructions,
+        "seconds": seconds,
+        "ticks_per_s": ticks / seconds,
+        "cycles_per_s": cycles / seconds,
+        "instructions_per_s": instructions / seconds,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+def run_suite(names=None, repeat=3, event_driven=False, data=None, key="key.txt",
+              profile_dir=None):
+    """
+    Mide los programas del proyecto y los kernels sintéticos, cada caso en un
+    proceso nuevo para que el pico de memoria sea solo el suyo
+    :param names: casos a medir (por defecto, todos)
+    :param data: archivo de datos para los programas de encriptación (por
+        defecto, DATA_BYTES bytes generados)
+    :param profile_dir: directorio donde escribir el perfil de cada caso en
+        pilas colapsadas (ver StageProfiler)
+    :return: diccionario nombre -> resultados
+    """
+    names = names or list(PROGRAMS) + list(KERNELS)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        if data is None:
+            data = os.path.join(tmp, "datos.txt")
+            with open(data, 'wb') as f:
+                f.write(bytes(range(256)) * (DATA_BYTES // 256) + bytes(range(DATA_BYTES % 256)))
+
+        for name in names:
+            if name in PROGRAMS:
+                program = ensamblar(os.path.join(SCRIPT_DIR, PROGRAMS[name]))
+                case_data, case_key = data, key
+            elif name in KERNELS:
+                program = ensamblar_fuente(KERNELS[name].strip() + "\n", name)
+                case_data, case_key = None, None
+            else:
+                raise ValueError(f"Caso de benchmark desconocido: {name}")
+
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                results[name] = pool.submit(measure, name, program, case_data, case_key,
+                                            repeat, event_driven, profile_dir).result()
+    return results
+
+def load_history(filename):
+    if not os.path.exists(filename):
+        return []
+    with open(filename) as f:
+        return json.load(f)
+
+def record(results, filename, event_driven):
+    """Agrega una corrida al historial y la devuelve"""
+    entry = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "event_driven": event_driven,
+        "results": results,
+    }
+    history = load_history(filename)
+    history.append(entry)
+    with open(filename, 'w') as f:
+        json.dump(history, f, indent=2)
+    return entry
+
+def latest(filename):
+    """Última corrida de un historial, o la corrida guardada como baseline"""
+    with open(filename) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        if not data:
+            raise ValueError(f"{filename} no tiene corridas")
+        return data[-1]
+    return data
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compara dos corridas caso por caso
+    :return: lista de (caso, ticks/s baseline, ticks/s actual, cambio, problema);
+        problema es None, 'regresión' si los ticks/s bajan más que threshold, o
+        'ciclos distintos' si la simulación dejó de dar los mismos ciclos
+    """
+    rows = []
+    for name, base in baseline["results"].items():
+        result = current["results"].get(name)
+        if result is None:
+            continue
+        change = result["ticks_per_s"] / base["ticks_per_s"] - 1
+        problem = None
+        if result["cycles"] != base["cycles"]:
+            problem = "ciclos distintos"
+        elif change < -threshold:
+            problem = "regresión"
+        rows.append((name, base["ticks_per_s"], result["ticks_per_s"], change, problem))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del simulador")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="mide y agrega la corrida al historial")
+    run.add_argument("cases", nargs="*", help="casos a medir (por defecto, todos)")
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument("--event-driven", action="store_true", help="saltar ciclos sin cambios")
+    run.add_argument("--data", help="archivo de datos para encriptar/desencriptar")
+    run.add_argument("--history", default=HISTORY_FILE)
+    run.add_argument("--save-baseline", metavar="ARCHIVO", help="guarda la corrida como baseline")
+    run.add_argument("--profile", metavar="DIRECTORIO",
+                     help="escribe el tiempo por etapa y unidad de cada caso en pilas colapsadas")
+
+    cmp = commands.add_parser("compare", help="compara contra un baseline")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current", nargs="?", default=HISTORY_FILE,
+                     help="corrida o historial a comparar (se usa su última corrida)")
+    cmp.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        if args.profile:
+            os.makedirs(args.profile, exist_ok=True)
+            args.profile = os.path.abspath(args.profile)
+        results = run_suite(args.cases, args.repeat, args.event_driven, args.data,
+                            profile_dir=args.profile)
+        entry = record(results, args.history, args.event_driven)
+        for name, r in results.items():
+            print(f"{name:14s} {r['cycles']:>10d} ciclos {r['ticks_per_s']:>12.0f} ticks/s "
+                  f"{r['instructions_per_s']:>12.0f} inst/s {r['peak_rss_kb'] or 0:>8d} KB")
+        if args.save_baseline:
+            with open(args.save_baseline, 'w') as f:
+                json.dump(entry, f, indent=2)
+        return 0
+
+    rows = compare(latest(args.baseline), latest(args.current), args.threshold)
+    failed = False
+    for name, base, current, change, problem in rows:
+        print(f"{name:14s} {base:>12.0f} -> {current:>12.0f} ticks/s {change:+7.1%}  {problem or ''}")
+        failed = failed or problem is not None
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+from bisect import bisect_right
+
+# Ciclos entre checkpoints por defecto
+CHECKPOINT_INTERVAL = 1000
+
+#Clase de checkpoints del simulador
+# Guarda periódicamente todo el estado de un Pipeline_marcador: registros,
+# Safe, memoria de datos, unidades funcionales, pc, reloj, los tiempos de
+# cada instrucción y la posición de la traza y de las estadísticas de
+# memoria; reg_status y los demás índices del scoreboard se reconstruyen a
+# partir de las unidades. La memoria de datos registra las
+# páginas que se escriben (dirty): cada checkpoint copia solo esas páginas y
+# comparte las demás con el checkpoint del que parte la simulación (base), y
+# restaurar reescribe solo las páginas escritas desde base o distintas entre
+# los dos checkpoints. Para volver a un ciclo se restaura el checkpoint más
+# cercano anterior y se simula hacia adelante hasta ese ciclo.
+class Checkpoints:
+    def __init__(self, sb, interval=CHECKPOINT_INTERVAL):
+        if interval <= 0:
+            raise ValueError("El intervalo de checkpoints debe ser positivo")
+        self.sb = sb
+        self.interval = interval
+        self.clocks = []          # relojes de los checkpoints, en orden
+        self.states = {}          # reloj -> estado guardado
+        self.base = None          # checkpoint igual a la memoria salvo las páginas dirty
+        self.next_clock = sb.clock
+        self.take()
+
+    def take(self):
+        """Guarda el estado actual si no hay ya un checkpoint en este ciclo"""
+        sb = self.sb
+        self.next_clock = sb.clock + self.interval
+        data_mem = sb.memory.data_mem
+        if sb.clock in self.states:
+            # La simulación es determinista: la memoria es la de ese checkpoint
+            self.base = sb.clock
+            data_mem.dirty.clear()
+            return
+
+        # Copiar solo las páginas escritas desde base y compartir las demás
+        if self.base is None:
+            pages = data_mem.snapshot_pages()
+            data_mem.track_dirty()
+        else:
+            pages = dict(self.states[self.base]["pages"])
+            pages.update(data_mem.snapshot_pages(data_mem.dirty))
+            data_mem.dirty.clear()
+        self.base = sb.clock
+
+        unit_index = {id(fu): i for i, fu in enumerate(sb.units)}
+        units = []
+        for fu in sb.units:
+            units.append((
+                fu.clocks, fu.latency, fu.busy, fu.fi, fu.fj, fu.fk,
+                unit_index[id(fu.qj)] if fu.qj is not None else None,
+                unit_index[id(fu.qk)] if fu.qk is not None else None,
+                fu.rj, fu.rk, fu.inst_pc, getattr(fu, 'opname', None),
+                fu.interlock, fu.zero_flag, fu.operands,
+            ))
+
+        self.states[sb.clock] = {
+            "registers": list(sb.registros.regs),
+            "safe": [[list(half) for half in key] for key in sb.safe.keys],
+            "pages": pages,
+            "units": units,
+            "counters": sb.counters.copy() if sb.counters is not None else None,
+            "trace": sb.tracer.mark() if sb.tracer is not None else None,
+            "memory_stats": sb.memory.stats.accesses if sb.memory.stats is not None else None,
+            "pc": sb.pc,
+            "wait_branch": sb.wait_branch,
+            "instructions": [(inst.issue, inst.read_ops, inst.ex_cmplt, inst.write_res, inst.result)
+                             for inst in sb.instructions],
+        }
+        self.clocks.insert(bisect_right(self.clocks, sb.clock), sb.clock)
+
+    def restore(self, clock):
+        """Vuelve al estado del checkpoint tomado en el ciclo clock"""
+        sb = self.sb
+        state = self.states[clock]
+        sb.clock = clock
+        sb.pc = state["pc"]
+        sb.wait_branch = state["wait_branch"]
+        sb.registros.regs[:] = state["registers"]
+        sb.safe.keys = [[list(half) for half in key] for key in state["safe"]]
+
+        # Páginas escritas desde base o que no comparten los dos checkpoints
+        data_mem = sb.memory.data_mem
+        current, pages = self.states[self.base]["pages"], state["pages"]
+        changed = data_mem.dirty | {index for index in current.keys() | pages.keys()
+                                    if current.get(index) is not pages.get(index)}
+        data_mem.restore_pages(pages, changed)
+        data_mem.dirty.clear()
+        self.base = clock
+
+        for fu, saved in zip(sb.units, state["units"]):
+            (fu.clocks, fu.latency, fu.busy, fu.fi, fu.fj, fu.fk, qj, qk, fu.rj, fu.rk,
+             fu.inst_pc, fu.opname, fu.interlock, fu.zero_flag, fu.operands) = saved
+            fu.qj = sb.units[qj] if qj is not None else None
+            fu.qk = sb.units[qk] if qk is not None else None
+        sb.index_units()
+        if state["counters"] is not None:
+            sb.counters = state["counters"].copy()
+        if state["trace"] is not None:
+            sb.tracer.rewind(state["trace"])
+        if state["memory_stats"] is not None and sb.memory.stats is not None:
+            sb.memory.stats.seek(state["memory_stats"])
+
+        for inst, saved in zip(sb.instructions, state["instructions"]):
+            inst.issue, inst.read_ops, inst.ex_cmplt, inst.write_res, inst.result = saved
+        self.next_clock = clock + self.interval
+
+    def goto(self, clock):
+        """Lleva la simulación al ciclo clock: restaura el checkpoint anterior
+        más cercano y simula ciclo a ciclo hasta llegar"""
+        sb = self.sb
+        position = bisect_right(self.clocks, clock) - 1
+        if position < 0:
+            raise ValueError(f"No hay checkpoint anterior al ciclo {clock}")
+        if not (self.clocks[position] <= sb.clock <= clock):
+            self.restore(self.clocks[position])
+
+        # Sin saltos de ciclos para detenerse exactamente en clock
+        event_driven = sb.event_driven
+        sb.event_driven = False
+        try:
+            while sb.clock < clock and not sb.done():
+                sb.tick()
+        finally:
+            sb.event_driven = event_driven
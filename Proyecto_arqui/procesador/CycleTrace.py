@@ -0,0 +1,173 @@
+import sys
+import json
+import struct
+from array import array
+from DM import WORD_TYPECODE
+from PerfCounters import unit_names
+
+# Identificador y versión del formato de traza
+TRACE_MAGIC = b'SBTR'
+TRACE_VERSION = 1
+
+# Etapas registradas por instancia dinámica de instrucción
+ISSUE, READ_OPS, EX_START, EX_CMPLT, WRITE_RES = range(5)
+STAGE_NAMES = ('issue', 'read_ops', 'ex_start', 'ex_cmplt', 'write_res')
+
+# Palabras de 32 bits por evento: ciclo, unidad, etapa, pc, instancia
+RECORD_WORDS = 5
+
+# Eventos que se acumulan en memoria antes de agregarlos al archivo
+FLUSH_EVENTS = 1 << 16
+
+def describe(inst):
+    """Texto corto de una instrucción predecodificada, p. ej. 'ADD R1, R2, 5'"""
+    operands = [f"R{inst.fi_idx}", f"R{inst.fj_idx}"]
+    if inst.fk_idx is not None:
+        operands.append(f"R{inst.fk_idx}")
+    elif inst.operand is not None:
+        operands.append(str(inst.operand))
+    return f"{inst.opname} {', '.join(operands)}"
+
+#Clase de traza de ciclos
+# Registra cada transición de etapa de cada instancia dinámica de instrucción
+# (cada vuelta de un ciclo es una instancia nueva) en un arreglo de enteros de
+# 32 bits. Con archivo, los eventos se agregan al final en bloques de
+# FLUSH_EVENTS: una cabecera (TRACE_MAGIC, versión, largo y JSON con los
+# nombres de las unidades y el programa) seguida de registros de RECORD_WORDS
+# palabras en little-endian. Sin archivo, los eventos quedan en self.events.
+# mark() y rewind() permiten a los checkpoints descartar los eventos
+# registrados después de un ciclo al que se vuelve.
+class CycleTracer:
+    def __init__(self, sb, filename=None):
+        self.events = array(WORD_TYPECODE)
+        self.filename = filename
+        self.unit_index = {id(fu): i for i, fu in enumerate(sb.units)}
+        self.instance = [0] * len(sb.units)  # instancia en curso de cada unidad
+        self.next_instance = 0
+        self.written = 0                     # eventos ya agregados al archivo
+
+        self.header = {
+            "version": TRACE_VERSION,
+            "units": unit_names(sb.units),
+            "program": [describe(inst) for inst in sb.instructions],
+        }
+
+        if filename is not None:
+            meta = json.dumps(self.header).encode()
+            header = TRACE_MAGIC + struct.pack('<II', TRACE_VERSION, len(meta)) + meta
+            self.header_bytes = len(header)
+            with open(filename, 'wb') as f:
+                f.write(header)
+
+    def record(self, clock, fu, stage):
+        """Agrega un evento de la unidad fu; ISSUE abre una instancia nueva"""
+        unit = self.unit_index[id(fu)]
+        if stage == ISSUE:
+            self.instance[unit] = self.next_instance
+            self.next_instance += 1
+        self.events.extend((clock, unit, stage, fu.inst_pc, self.instance[unit]))
+        if self.filename is not None and len(self.events) >= FLUSH_EVENTS * RECORD_WORDS:
+            self.flush()
+
+    def flush(self):
+        """Agrega los eventos pendientes al archivo"""
+        if self.filename is None or not self.events:
+            return
+        events = self.events
+        if sys.byteorder == 'big':
+            events = array(events.typecode, events)
+            events.byteswap()
+        with open(self.filename, 'ab') as f:
+            events.tofile(f)
+        self.written += len(self.events) // RECORD_WORDS
+        del self.events[:]
+
+    def mark(self):
+        """Posición actual de la traza, para volver a ella con rewind"""
+        return self.written + len(self.events) // RECORD_WORDS, list(self.instance), self.next_instance
+
+    def rewind(self, mark):
+        """Descarta los eventos registrados después de mark y vuelve a las
+        instancias en curso de ese momento"""
+        count, instance, self.next_instance = mark
+        self.instance[:] = instance
+        if count >= self.written:
+            del self.events[(count - self.written) * RECORD_WORDS:]
+            return
+        # Parte de lo descartado ya está en el archivo
+        del self.events[:]
+        with open(self.filename, 'r+b') as f:
+            f.truncate(self.header_bytes + 4 * RECORD_WORDS * count)
+        self.written = count
+
+    def close(self):
+        self.flush()
+
+    @staticmethod
+    def load(filename):
+        """Lee un archivo de traza; devuelve (cabecera, arreglo de eventos)"""
+        with open(filename, 'rb') as f:
+            if f.read(4) != TRACE_MAGIC:
+                raise ValueError(f"{filename} no es un archivo de traza")
+            version, length = struct.unpack('<II', f.read(8))
+            if version != TRACE_VERSION:
+                raise ValueError(f"Versión de traza no soportada: {version}")
+            header = json.loads(f.read(length))
+            events = array(WORD_TYPECODE)
+            events.frombytes(f.read())
+        if sys.byteorder == 'big':
+            events.byteswap()
+        return header, events
+
+    @staticmethod
+    def export_chrome(header, events, filename):
+        """
+        Escribe los eventos en formato trace-event JSON de Chrome/Perfetto: un
+        hilo por unidad funcional, un evento por instancia de instrucción (de
+        issue a write_res) con sus etapas anidadas. Un ciclo equivale a 1 µs
+        """
+        units = header["units"]
+        program = header["program"]
+
+        # Tiempos de cada etapa por instancia
+        instances = {}
+        for i in range(0, len(events), RECORD_WORDS):
+            clock, unit, stage, pc, instance = events[i:i + RECORD_WORDS]
+            stamps = instances.get(instance)
+            if stamps is None:
+                stamps = instances[instance] = [unit, pc, None, None, None, None, None]
+            stamps[2 + stage] = clock
+
+        with open(filename, 'w') as f:
+            f.write('{"displayTimeUnit": "ns", "traceEvents": [\n')
+            for unit, name in enumerate(units):
+                f.write(json.dumps({"ph": "M", "name": "thread_name", "pid": 0, "tid": unit,
+                                    "args": {"name": name}}) + ',\n')
+
+            first = True
+            for instance, (unit, pc, issue, read_ops, ex_start, ex_cmplt, write_res) in sorted(instances.items()):
+                # Instancias sin escritura (la simulación se detuvo antes) llegan
+                # hasta su última etapa registrada
+                end = max(t for t in (issue, read_ops, ex_start, ex_cmplt, write_res) if t is not None)
+                if write_res is not None:
+                    end = write_res
+                spans = [(program[pc], issue, end + 1)]
+                if read_ops is not None:
+                    spans.append(("lectura de operandos", issue, read_ops + 1))
+                if ex_start is not None:
+                    spans.append(("ejecución", ex_start, (ex_cmplt if ex_cmplt is not None else end) + 1))
+                if ex_cmplt is not None and write_res is not None and write_res > ex_cmplt + 1:
+                    spans.append(("espera escritura", ex_cmplt + 1, write_res))
+                for name, start, stop in spans:
+                    event = {"name": name, "ph": "X", "pid": 0, "tid": unit, "ts": start,
+                             "dur": stop - start, "args": {"pc": pc, "instancia": instance}}
+                    f.write(('' if first else ',\n') + json.dumps(event))
+                    first = False
+            f.write('\n]}\n')
+
+# Convierte un archivo de traza a JSON de Chrome/Perfetto
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python CycleTrace.py traza.bin salida.json")
+        sys.exit(1)
+    CycleTracer.export_chrome(*CycleTracer.load(sys.argv[1]), sys.argv[2])
@@ -3,18 +3,15 @@ from fu import FunctionalUnit
 
 class DIV(FunctionalUnit): 
 
-    def __init__(self):  
-        super().__init__("div",40)
+    def __init__(self, clocks=40):  
+        super().__init__("div",clocks)
         self.zero_flag = False
 
-    def execute(self, opcode: str, val1: int, val2: int, val3: int = 0):
-        self.clocks -= 1
-        try:
-            if opcode == "DIV":
-                if val2 == 0:
-                    return 0, "Error: División por cero"
-                return val1 // val2, ""
-            else:
-                return 0, f"Opcode no soportado: {opcode}"
-        except Exception as e:
-            return 0, f"Error de ejecución: {str(e)}"
\ No newline at end of file
+    def div(self, val1: int, val2: int, val3: int = 0):
+        if val2 == 0:
+            return 0, "Error: División por cero"
+        return val1 // val2, ""
+
+    operations = {
+        "DIV": div,
+    }
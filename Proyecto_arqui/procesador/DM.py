@@ -1,10 +1,21 @@
 import os
+import sys
+from array import array
+
+# Tipo de arreglo con elementos de 32 bits sin signo
+WORD_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+# Palabras por página en las copias para checkpoints
+SNAPSHOT_PAGE_WORDS = 1024
+
 #Clase del DataMemory
 class DM:
     def __init__(self, size=4096):
-        self.memory = [0] * size
+        # Memoria contigua de palabras de 32 bits
+        self.memory = array(WORD_TYPECODE, bytes(4 * size))
         self.size = size
         self.keys = {}
+        self.dirty = None         # páginas escritas desde el último checkpoint (ver track_dirty)
 
     def read(self, address, mem_read=False):
         if not mem_read:
@@ -19,6 +30,58 @@ class DM:
         if address < 0 or address >= self.size:
             return
         self.memory[address] = data & 0xFFFFFFFF
+        if self.dirty is not None:
+            self.dirty.add(address // SNAPSHOT_PAGE_WORDS)
+
+    def track_dirty(self):
+        """Empieza a registrar en dirty las páginas que se escriben"""
+        self.dirty = set()
+
+    def mark_dirty(self, first, last):
+        """Registra como escritas las páginas de las direcciones [first, last)"""
+        if self.dirty is not None and first < last:
+            self.dirty.update(range(first // SNAPSHOT_PAGE_WORDS, (last - 1) // SNAPSHOT_PAGE_WORDS + 1))
+
+    def export_bytes(self, start_address: int, n_words: int):
+        """Devuelve las palabras [start_address, start_address + n_words) como bytes
+        little-endian; las direcciones fuera de memoria se leen como 0"""
+        end = start_address + n_words
+        first = min(max(start_address, 0), end)
+        last = max(min(end, self.size), first)
+        words = self.memory[first:last]
+        if sys.byteorder == 'big':
+            words.byteswap()
+        before = b'\x00' * (4 * (first - start_address))
+        after = b'\x00' * (4 * (end - last))
+        return before + words.tobytes() + after
+
+    def extent(self):
+        """Cantidad de palabras desde la dirección 0 que pueden contener datos"""
+        return self.size
+
+    def iter_words(self):
+        """Recorre (dirección, valor) de las palabras almacenadas"""
+        return enumerate(self.memory)
+
+    def snapshot_pages(self, indexes=None):
+        """Copia la memoria en páginas de SNAPSHOT_PAGE_WORDS palabras: {página: bytes};
+        con indexes, solo esas páginas"""
+        if indexes is None:
+            indexes = range((self.size + SNAPSHOT_PAGE_WORDS - 1) // SNAPSHOT_PAGE_WORDS)
+        return {index: self.memory[index * SNAPSHOT_PAGE_WORDS:(index + 1) * SNAPSHOT_PAGE_WORDS].tobytes()
+                for index in indexes}
+
+    def restore_pages(self, pages, indexes=None):
+        """Vuelve a la memoria guardada con snapshot_pages; con indexes, solo esas páginas"""
+        for index in (pages if indexes is None else indexes):
+            data = pages[index]
+            start = index * SNAPSHOT_PAGE_WORDS
+            words = array(WORD_TYPECODE)
+            words.frombytes(data)
+            self.memory[start:start + len(words)] = words
+
+    def close(self):
+        """La memoria plana no tiene recursos que liberar (ver PagedDM.close)"""
 
     def add_delta(self, register_value, dlt_op=False):
         DELTA = 0x9E3779B9
@@ -26,17 +89,45 @@ class DM:
             return register_value
         return (register_value + DELTA) & 0xFFFFFFFF
     
+    def store_words(self, start_address: int, words):
+        """Copia en bloque una secuencia de palabras, ignorando las que caen fuera de memoria"""
+        first = max(0, -start_address)
+        last = min(len(words), self.size - start_address)
+        if first >= last:
+            return
+        self.memory[start_address + first:start_address + last] = array(WORD_TYPECODE, (word & 0xFFFFFFFF for word in words[first:last]))
+        self.mark_dirty(start_address + first, start_address + last)
+
+    def load_bytes(self, data, start_address: int = 0):
+        """Carga bytes como palabras little-endian a partir de start_address"""
+        # Palabras que caben en memoria (las que quedan fuera se ignoran, como en write)
+        n_words = (len(data) + 3) // 4
+        first = max(0, -start_address)
+        last = min(n_words, self.size - start_address)
+        if first >= last:
+            return
+
+        data = memoryview(data)[first * 4:last * 4]
+        if len(data) % 4:
+            # Rellenamos con ceros el último bloque si es menor a 4 bytes (padding)
+            data = bytes(data).ljust((last - first) * 4, b'\x00')
+
+        if sys.byteorder == 'little':
+            # Copia directa de los bytes al arreglo de la memoria
+            offset = (start_address + first) * 4
+            with memoryview(self.memory) as words, words.cast('B') as raw:
+                raw[offset:offset + len(data)] = data
+        else:
+            words = array(WORD_TYPECODE)
+            words.frombytes(data)
+            words.byteswap()
+            self.memory[start_address + first:start_address + last] = words
+        self.mark_dirty(start_address + first, start_address + last)
+
     def load_file(self, filename: str, start_address: int = 0):
         full_path = os.path.join(os.path.dirname(__file__), filename)
         with open(full_path, "rb") as f:
-            data = f.read()
-            for i in range(0, len(data), 4):
-                # Tomamos bloques de 4 bytes
-                word_bytes = data[i:i+4]
-                # Rellenamos con ceros si el bloque es menor a 4 bytes (padding)
-                word = int.from_bytes(word_bytes.ljust(4, b'\x00'), byteorder="little")
-                # Escribimos la palabra en memoria
-                self.write(start_address + (i // 4), word, mem_write=True)
+            self.load_bytes(f.read(), start_address)
 
     def load_key(self, filename: str, start_address: int = 0):
         full_path = os.path.join(os.path.dirname(__file__), filename)
@@ -48,10 +139,8 @@ class DM:
 
             print(f"llave leída: {hex_key}")
 
-            for i in range(0, len(hex_key), 8):
-                word_hex = hex_key[i:i+8]
-                word = int(word_hex, 16)
-                self.write(start_address + (i // 8), word, mem_write=True)
+            words = [int(hex_key[i:i+8], 16) for i in range(0, len(hex_key), 8)]
+            self.store_words(start_address, words)
 
     def load_hex_lines(self, filename: str, start_address: int = 0):
         full_path = os.path.join(os.path.dirname(__file__), filename)
@@ -59,6 +148,7 @@ class DM:
             lines = f.readlines()
 
             addr = start_address
+            words = []
             for line in lines:
                 hex_str = line.strip().lower()
                 if not hex_str:
@@ -73,9 +163,11 @@ class DM:
                     raise ValueError(f"Línea inválida en el archivo: {line.strip()}")
 
                 print(f"Escribiendo 0x{hex_str.upper()} en dirección {addr}")
-                self.write(addr, word, mem_write=True)
+                words.append(word)
                 addr += 1
 
+            self.store_words(start_address, words)
+
 if __name__ == "__main__":
     dm = DM(size=4096)  # Instancia de tu clase de memoria
     dm.load_file("jorge_luis.txt", start_address=0)
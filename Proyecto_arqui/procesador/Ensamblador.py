@@ -0,0 +1,163 @@
+from traductor import traducir_instruccion
+from Programa import Program, WORD_BITS
+
+# Clases de línea del código fuente
+BLANK, LABEL, INSTRUCTION = range(3)
+
+def classify(line):
+    """(clase, texto): la misma separación que traductor.separar_etiquetas"""
+    line = line.strip()
+    if not line:
+        return BLANK, None
+    if ':' in line:
+        return LABEL, line.replace(':', '').strip()
+    return INSTRUCTION, line
+
+def branch_target(text):
+    """Etiqueta o número al que salta un LOOP, o None si no es un salto"""
+    parts = text.replace(',', '').split()
+    if parts and parts[0] == 'LOOP' and len(parts) > 2:
+        return parts[2]
+    return None
+
+def encode(text, addresses, pc):
+    """(binario, error) de una instrucción con las direcciones de etiqueta dadas"""
+    try:
+        binary = traducir_instruccion(text, addresses, pc)
+    except KeyError as e:
+        return None, f"Instrucción desconocida: {e.args[0]}"
+    except IndexError:
+        return None, f"Faltan operandos: '{text}'"
+    except ValueError as e:
+        if str(e).startswith("invalid literal"):  # de int(): inmediato o registro mal escrito
+            return None, f"Valor inválido: '{text}'"
+        return None, str(e)
+    if len(binary) != WORD_BITS or binary.strip('01'):
+        return None, f"Inmediato fuera de rango (0 a 255): '{text}'"
+    return binary, None
+
+#Clase de ensamblador incremental
+# Mantiene el código de un editor ya ensamblado: la clase de cada línea, la
+# instrucción codificada de cada línea (índice línea -> instrucción), la
+# dirección de cada instrucción y la de cada etiqueta. update() reemplaza un
+# rango de líneas y vuelve a codificar solo esas líneas; si la edición cambia
+# la dirección de alguna etiqueta (se agregan o quitan instrucciones antes de
+# ella, o se agregan, quitan o renombran etiquetas), también los saltos que
+# apuntan a las etiquetas que cambiaron. Los errores de codificación quedan por
+# línea, y program() arma el programa sin volver a traducir nada.
+class IncrementalAssembler:
+    def __init__(self, text="", name=None):
+        self.name = name
+        self.kinds = []      # clase de cada línea
+        self.texts = []      # instrucción o nombre de etiqueta de cada línea
+        self.binaries = []   # instrucción codificada de cada línea, o None
+        self.errors = []     # mensaje de error de cada línea, o None
+        self.pcs = []        # dirección de cada línea (la de la próxima instrucción)
+        self.addresses = {}  # etiqueta -> dirección
+        self.n_errors = 0
+        self.program_cache = None
+        self.encoded_lines = 0  # líneas codificadas desde el inicio (estadística)
+        self.set_text(text)
+
+    def set_text(self, text):
+        """Reemplaza todo el código"""
+        self.update(0, len(self.kinds), text.split('\n'))
+
+    def line_count(self):
+        return len(self.kinds)
+
+    def update(self, first, removed, lines):
+        """
+        Reemplaza las líneas first..first+removed-1 por lines
+        :return: números de línea (desde 0) que se volvieron a codificar
+        """
+        old = self.kinds[first:first + removed]
+        new = [classify(line) for line in lines]
+        end = first + len(new)
+
+        # Las direcciones solo cambian si la edición toca etiquetas o cambia la
+        # cantidad de instrucciones
+        relocate = (LABEL in old or any(kind == LABEL for kind, _ in new)
+                    or old.count(INSTRUCTION) != sum(kind == INSTRUCTION for kind, _ in new))
+
+        # Se trabaja sobre copias y el estado se reemplaza al final: si algo
+        # falla a mitad de la edición, el ensamblador queda como estaba
+        def splice(items, added):
+            return items[:first] + added + items[first + removed:]
+        kinds = splice(self.kinds, [kind for kind, _ in new])
+        texts = splice(self.texts, [text for _, text in new])
+        binaries = splice(self.binaries, [None] * len(new))
+        errors = splice(self.errors, [None] * len(new))
+        pcs = splice(self.pcs, [0] * len(new))
+        n_errors = self.n_errors - sum(error is not None
+                                       for error in self.errors[first:first + removed])
+
+        pc = pcs[first - 1] + (kinds[first - 1] == INSTRUCTION) if first else 0
+        addresses = self.addresses
+        if relocate:
+            addresses = self.__relocate(kinds, texts, pcs, first, pc)
+            moved = {name for name in self.addresses.keys() | addresses.keys()
+                     if self.addresses.get(name) != addresses.get(name)}
+        else:
+            # Misma cantidad de instrucciones: solo cambian las direcciones
+            # dentro del rango editado
+            for i in range(first, end):
+                pcs[i] = pc
+                pc += kinds[i] == INSTRUCTION
+            moved = ()
+
+        encoded = list(range(first, end))
+        if moved:
+            encoded += [i for i, kind in enumerate(kinds)
+                        if kind == INSTRUCTION and not first <= i < end
+                        and branch_target(texts[i]) in moved]
+        encoded_lines = 0
+        for i in encoded:
+            if errors[i] is not None:
+                n_errors -= 1
+            binary = error = None
+            if kinds[i] == INSTRUCTION:
+                binary, error = encode(texts[i], addresses, pcs[i])
+                encoded_lines += 1
+            binaries[i] = binary
+            errors[i] = error
+            if error is not None:
+                n_errors += 1
+
+        self.kinds, self.texts, self.pcs = kinds, texts, pcs
+        self.binaries, self.errors, self.n_errors = binaries, errors, n_errors
+        self.addresses = addresses
+        self.encoded_lines += encoded_lines
+        self.program_cache = None
+        return encoded
+
+    # Recalcula las direcciones de las líneas desde first y devuelve las de
+    # todas las etiquetas (la última definición de un nombre es la que vale)
+    @staticmethod
+    def __relocate(kinds, texts, pcs, first, pc):
+        for i in range(first, len(kinds)):
+            pcs[i] = pc
+            if kinds[i] == INSTRUCTION:
+                pc += 1
+        return {texts[i]: pcs[i] for i, kind in enumerate(kinds) if kind == LABEL}
+
+    def line_errors(self):
+        """Lista de (número de línea desde 0, mensaje)"""
+        if not self.n_errors:
+            return []
+        return [(i, error) for i, error in enumerate(self.errors) if error is not None]
+
+    def instruction_at(self, line):
+        """Dirección de la instrucción de una línea, o None si no tiene"""
+        return self.pcs[line] if self.kinds[line] == INSTRUCTION else None
+
+    def program(self):
+        """Programa ensamblado; ValueError con la primera línea con error"""
+        if self.n_errors:
+            line, error = self.line_errors()[0]
+            raise ValueError(f"Línea {line + 1}: {error}")
+        if self.program_cache is None:
+            lines = [binary for binary in self.binaries if binary is not None]
+            self.program_cache = Program([int(binary, 2) for binary in lines], self.name,
+                                         lines=lines)
+        return self.program_cache
@@ -0,0 +1,51 @@
+# Estados de una estación de reserva ocupada
+WAITING, EXECUTING, DONE = range(3)
+
+#Clase de estación de reserva
+# Entrada del motor de Tomasulo para una instrucción emitida. Los valores de
+# los operandos se copian al emitir, o llegan por el bus común de datos, a
+# regs: una lista indexada por número de registro, como el banco de registros,
+# para que el handler predecodificado de la instrucción la lea igual (la unidad
+# de memoria lee además R1-R4 de regs para STK). pending son los registros
+# cuyo valor todavía produce otra estación, y consumers las estaciones (con el
+# registro) que esperan el resultado de esta.
+class ReservationStation:
+    def __init__(self, type, index):
+        self.type = type          # tipo de unidad funcional que la ejecuta
+        self.index = index        # posición entre las estaciones del motor
+        self.regs = [0] * 16      # valores de los operandos por registro
+        self.clear()
+
+    def __repr__(self):
+        return f"{self.type}{self.index}"
+
+    """Frees the station so another instruction can be issued to it"""
+    def clear(self):
+        self.busy = False
+        self.state = WAITING
+        self.inst = None
+        self.inst_pc = -1
+        self.seq = -1             # orden de emisión
+        self.pending = set()      # registros que esperan un resultado
+        self.consumers = []       # (estación, registro) que esperan a esta
+        self.unit = None          # unidad funcional que la ejecuta
+        self.result = None
+        self.taken = False        # LOOP: el salto se tomó
+        self.done_clock = -1      # ciclo en que terminó de ejecutar
+
+    """Issues an instruction to the station"""
+    def issue(self, inst, pc, seq):
+        self.busy = True
+        self.state = WAITING
+        self.inst = inst
+        self.inst_pc = pc
+        self.seq = seq
+
+    """Receives the value of register reg from the common data bus"""
+    def capture(self, reg, value):
+        self.regs[reg] = value
+        self.pending.discard(reg)
+
+    """Determines if all operands have their values"""
+    def ready(self):
+        return self.busy and self.state == WAITING and not self.pending
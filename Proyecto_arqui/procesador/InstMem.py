@@ -1,13 +1,24 @@
 import os
+from Programa import Program
 
 class InstMem:
     def __init__(self):
         self.memory = []
+        self.program = None
 
+    # Acepta un programa ya ensamblado (Program), un archivo empaquetado o un
+    # archivo de texto con una instrucción '0'/'1' por línea
     def load_instructions(self, filename):
-        full_path = os.path.join(os.path.dirname(__file__), filename)
-        with open(full_path, 'r') as f:
-            self.memory = [line.strip() for line in f if line.strip()]
+        if isinstance(filename, Program):
+            self.program = filename
+        else:
+            full_path = os.path.join(os.path.dirname(__file__), filename)
+            if Program.is_packed(full_path):
+                self.program = Program.load(full_path, filename)
+            else:
+                with open(full_path, 'r') as f:
+                    self.program = Program.from_lines(f, filename)
+        self.memory = self.program.lines
 
     def fetch(self, address):
         index = address // 4  # Cada instrucción ocupa 4 bytes
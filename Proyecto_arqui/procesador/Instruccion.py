@@ -15,6 +15,14 @@ class Instruction:
         self.repr = repr      # instrucción binaria original
         self.opname = opname  # nombre legible, como 'ADD', 'SUB', etc.
         self.result = None
+        # Campos predecodificados (ver ScoreboardParser)
+        self.fi_idx = self.fj_idx = self.fk_idx = None  # índices enteros de registro
+        self.fi_slot = self.fj_slot = self.fk_slot = None  # entradas de reg_status
+        self.operand = None   # inmediato o destino del salto ya resuelto a entero
+        self.handler = None   # handler(fu, regs) que ejecuta un ciclo de la instrucción
+        self.is_branch = False
+        self.interlock = ()   # registros que deben estar libres para ejecutar
+        self.latency = None   # ciclos de ejecución; None usa los de la unidad
 
     def __str__(self):
         return (
@@ -3,28 +3,42 @@ from fu import FunctionalUnit
 
 class Memory(FunctionalUnit): 
 
-    def __init__(self,safe,memory, registros):  
-        super().__init__("memory",3)
+    def __init__(self,safe,memory, registros, clocks=3):  
+        super().__init__("memory",clocks)
         self.zero_flag = False
         self.memory = memory
         self.safe = safe 
         self.regs = registros 
 
-    def execute(self, opcode: str, address: int = 0, val: int = 0, val2: int = 0):
-        self.clocks -= 1
-        try:
-            if opcode == "LOAD":
-                addr = address + val
-                return self.memory.read_data(address, True)
-            elif opcode == "STOR":
-                addr = address + val
-                self.memory.write_data(addr, val2, True)
-            elif opcode == "STK":
-                if self.clocks == 2:
-                    self.safe.store_key(val2, self.regs.regs[1], self.regs.regs[2], self.regs.regs[3], self.regs.regs[4])
-            elif opcode == "DLT":
-                return self.memory.apply_delta(val2, True)
-            else:
-                return 0, f"Opcode no soportado: {opcode}"
-        except Exception as e:
-            return 0, f"Error de ejecución: {str(e)}"
\ No newline at end of file
+    # LOAD, STOR y DLT usan los registros leídos en read operands: una
+    # instrucción posterior puede escribir sus operandos (WAR) mientras la
+    # unidad todavía ejecuta, con cualquier latencia. STK lee R1-R4 al
+    # ejecutar, cuando el interlock garantiza que están escritos
+    def read_operands(self):
+        super().read_operands()
+        self.operands = list(self.regs.regs)
+
+    def load(self, address: int = 0, val: int = 0, val2: int = 0):
+        addr = address + val
+        return self.memory.read_data(address, True, self.first_clock())
+
+    def stor(self, address: int = 0, val: int = 0, val2: int = 0):
+        addr = address + val
+        self.memory.write_data(addr, val2, True, self.first_clock())
+
+    # La llave se guarda una sola vez, en el primer ciclo de ejecución, para
+    # cualquier latencia de STK (también en el modo funcional, que ejecuta un
+    # solo ciclo)
+    def stk(self, address: int = 0, val: int = 0, val2: int = 0):
+        if self.first_clock():
+            self.safe.store_key(val2, self.regs.regs[1], self.regs.regs[2], self.regs.regs[3], self.regs.regs[4])
+
+    def dlt(self, address: int = 0, val: int = 0, val2: int = 0):
+        return self.memory.apply_delta(val2, True)
+
+    operations = {
+        "LOAD": load,
+        "STOR": stor,
+        "STK": stk,
+        "DLT": dlt,
+    }
@@ -3,16 +3,13 @@ from fu import FunctionalUnit
 
 class MULT(FunctionalUnit): 
 
-    def __init__(self):  
-        super().__init__("mult",1)
+    def __init__(self, clocks=1):  
+        super().__init__("mult",clocks)
         self.zero_flag = False
 
-    def execute(self, opcode: str, val1: int, val2: int, val3: int = 0):
-        self.clocks -= 1
-        try:
-            if opcode == "MUL":
-                return val1 * val2
-            else:
-                return 0, f"Opcode no soportado: {opcode}"
-        except Exception as e:
-            return 0, f"Error de ejecución: {str(e)}"
\ No newline at end of file
+    def mul(self, val1: int, val2: int, val3: int = 0):
+        return val1 * val2
+
+    operations = {
+        "MUL": mul,
+    }
@@ -0,0 +1,105 @@
+import os
+import json
+from Instruccion import opcode_names
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: solo descripciones JSON
+    tomllib = None
+
+# Descripción de la máquina del proyecto
+DEFAULT_MACHINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "machine.json")
+
+# Tipos de unidad funcional que se pueden describir
+UNIT_TYPES = ('alu', 'memory', 'saxs', 'mult', 'div')
+
+#Clase de descripción de máquina
+# Describe la mezcla de unidades funcionales (tipo, cantidad y latencia, en el
+# orden en que el scoreboard las recorre), la latencia de cada opcode y el
+# tamaño de la memoria de datos. Se lee de un archivo JSON o TOML con las
+# claves data_words, issue_width (instrucciones que se emiten por ciclo, 1 por
+# defecto), units (lista de {type, count, latency}) y opcode_latency
+# ({opcode: ciclos}); los opcodes sin latencia propia usan la de su unidad.
+# reservation_stations ({tipo: cantidad}) solo lo usa el motor de Tomasulo.
+# STK acepta cualquier latencia: la unidad de memoria guarda la llave en el
+# primer ciclo de ejecución.
+class MachineDescription:
+    def __init__(self, description):
+        self.data_words = int(description.get("data_words", 15360))
+        if self.data_words <= 0:
+            raise ValueError("data_words debe ser positivo")
+        self.issue_width = int(description.get("issue_width", 1))
+        if self.issue_width <= 0:
+            raise ValueError("issue_width debe ser positivo")
+
+        self.units = []          # (tipo, latencia) por unidad, en orden
+        for entry in description.get("units", ()):
+            unit_type = entry.get("type")
+            if unit_type not in UNIT_TYPES:
+                raise ValueError(f"Tipo de unidad desconocido: {unit_type}")
+            count = int(entry.get("count", 1))
+            latency = int(entry.get("latency", 1))
+            if count < 0 or latency <= 0:
+                raise ValueError(f"Cantidad o latencia inválida para {unit_type}")
+            self.units.extend([(unit_type, latency)] * count)
+
+        self.reservation_stations = {}
+        for unit_type, count in description.get("reservation_stations", {}).items():
+            if unit_type not in UNIT_TYPES:
+                raise ValueError(f"Tipo de unidad desconocido: {unit_type}")
+            if int(count) <= 0:
+                raise ValueError(f"Cantidad de estaciones inválida para {unit_type}")
+            self.reservation_stations[unit_type] = int(count)
+
+        self.opcode_latency = {}
+        for opname, latency in description.get("opcode_latency", {}).items():
+            if opname not in opcode_names.values():
+                raise ValueError(f"Opcode desconocido: {opname}")
+            if int(latency) <= 0:
+                raise ValueError(f"Latencia inválida para {opname}")
+            self.opcode_latency[opname] = int(latency)
+
+    @staticmethod
+    def load(filename):
+        """Lee una descripción .json o .toml"""
+        if filename.endswith(".toml"):
+            if tomllib is None:
+                raise ValueError("Leer TOML requiere Python 3.11 o superior")
+            with open(filename, "rb") as f:
+                return MachineDescription(tomllib.load(f))
+        with open(filename) as f:
+            return MachineDescription(json.load(f))
+
+    @staticmethod
+    def default():
+        return MachineDescription.load(DEFAULT_MACHINE)
+
+    @staticmethod
+    def resolve(machine):
+        """Acepta None (máquina por defecto), una ruta, un diccionario o una descripción"""
+        if machine is None:
+            return MachineDescription.default()
+        if isinstance(machine, MachineDescription):
+            return machine
+        if isinstance(machine, dict):
+            return MachineDescription(machine)
+        return MachineDescription.load(machine)
+
+    def latency(self, inst):
+        """Ciclos de ejecución de una instrucción, o None si usa la latencia de su unidad"""
+        return self.opcode_latency.get(inst.opname)
+
+    def to_dict(self):
+        units = []
+        for unit_type, latency in self.units:
+            if units and units[-1]["type"] == unit_type and units[-1]["latency"] == latency:
+                units[-1]["count"] += 1
+            else:
+                units.append({"type": unit_type, "count": 1, "latency": latency})
+        return {
+            "data_words": self.data_words,
+            "issue_width": self.issue_width,
+            "units": units,
+            "opcode_latency": dict(self.opcode_latency),
+            "reservation_stations": dict(self.reservation_stations),
+        }
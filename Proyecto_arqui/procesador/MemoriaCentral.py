@@ -1,10 +1,46 @@
 from DM import DM as DataMemory
+from PagedDM import PagedDM as PagedDataMemory
 from InstMem import InstMem as InstructionMemory  
+from MemoryStats import MemoryStats
 
 class CentralMemory:
-    def __init__(self, data_size=4096):
-        self.data_mem = DataMemory(size=data_size)
+    def __init__(self, data_size=4096, paged=False, backing_file=None):
+        # La memoria paginada reserva páginas solo al escribirlas
+        if paged:
+            self.data_mem = PagedDataMemory(size=data_size, backing_file=backing_file)
+        else:
+            self.data_mem = DataMemory(size=data_size)
         self.inst_mem = InstructionMemory()
+        self.stats = None
+
+    # Estadísticas de acceso: solo cuando están activas se reemplazan
+    # read_data/write_data por versiones que registran cada acceso. La unidad
+    # de memoria repite el acceso en cada ciclo de ejecución y pasa
+    # record=False en todos salvo el primero
+    def enable_stats(self, page_words=None):
+        self.stats = MemoryStats() if page_words is None else MemoryStats(page_words)
+        self.read_data = self.__read_data_recorded
+        self.write_data = self.__write_data_recorded
+        return self.stats
+
+    def disable_stats(self):
+        self.stats = None
+        self.__dict__.pop('read_data', None)
+        self.__dict__.pop('write_data', None)
+
+    def __read_data_recorded(self, address, mem_read=False, record=True):
+        if mem_read and record:
+            self.stats.record(address, False)
+        return self.data_mem.read(address, mem_read)
+
+    def __write_data_recorded(self, address, data, mem_write=False, record=True):
+        if mem_write and record:
+            self.stats.record(address, True)
+        self.data_mem.write(address, data, mem_write)
+
+    # Libera la memoria de datos (páginas mapeadas y archivo de respaldo)
+    def close(self):
+        self.data_mem.close()
 
     # Memoria de instrucciones
     def load_instructions(self, instructions):
@@ -14,12 +50,15 @@ class CentralMemory:
         return self.inst_mem.fetch(address)
 
     # Memoria de datos
-    def read_data(self, address, mem_read=False):
+    def read_data(self, address, mem_read=False, record=True):
         return self.data_mem.read(address, mem_read)
 
-    def write_data(self, address, data, mem_write=False):
+    def write_data(self, address, data, mem_write=False, record=True):
         self.data_mem.write(address, data, mem_write)
 
+    def export_data(self, address, n_words):
+        return self.data_mem.export_bytes(address, n_words)
+
     def apply_delta(self, value, dlt_op=False):
         return self.data_mem.add_delta(value, dlt_op)
 
@@ -30,7 +69,7 @@ class CentralMemory:
             print(f"Address {i * 4:04}: {instr}")
 
         print("\n=== Data Memory (non-zero only) ===")
-        for i, val in enumerate(self.data_mem.memory):
+        for i, val in self.data_mem.iter_words():
             if val != 0:
                 print(f"Address {i:04}: 0x{val:08X}")
 
@@ -0,0 +1,185 @@
+import sys
+import json
+import zipfile
+from array import array
+from collections import Counter
+from DM import WORD_TYPECODE
+
+# Palabras por página para los contadores por página
+STATS_PAGE_WORDS = 1024
+
+# Cubetas del histograma de distancia de reuso: la cubeta b cuenta las
+# distancias d con d.bit_length() == b (0, 1, 2-3, 4-7, ...)
+REUSE_BUCKETS = 65
+
+#Clase de estadísticas de acceso a memoria de datos
+# Registra cada lectura y escritura que hacen las unidades de memoria: conteos
+# por palabra y por página, distancia de reuso (cantidad de direcciones
+# distintas entre dos accesos a la misma dirección) y stride entre accesos
+# consecutivos. Cada LOAD/STOR cuenta como un acceso, en su primer ciclo de
+# ejecución, tanto en modo temporizado como funcional. Los accesos quedan
+# además en un registro en orden (log) que no se descarta al retroceder: los
+# checkpoints llevan las estadísticas a cualquier cantidad de accesos ya
+# registrada con seek.
+class MemoryStats:
+    def __init__(self, page_words=STATS_PAGE_WORDS):
+        if page_words <= 0 or page_words & (page_words - 1):
+            raise ValueError("El tamaño de página debe ser una potencia de 2")
+        self.page_words = page_words
+        self.page_shift = page_words.bit_length() - 1
+        self.page_mask = page_words - 1
+        self.log = array('q')         # direcciones accedidas, en orden
+        self.log_writes = array('B')  # 1 si el acceso del log fue una escritura
+        self.__reset()
+
+    def __reset(self):
+        self.reads = {}           # página -> lecturas por palabra
+        self.writes = {}          # página -> escrituras por palabra
+        self.reuse = array('Q', [0] * REUSE_BUCKETS)
+        self.cold = 0             # primeros accesos (sin reuso)
+        self.strides = Counter()
+        self.accesses = 0
+        self.last_address = None
+
+        # Árbol de Fenwick sobre los instantes de acceso: marca solo el último
+        # acceso de cada dirección, así la suma entre dos instantes es la
+        # cantidad de direcciones distintas usadas entre ellos
+        self.last_access = {}
+        self.capacity = 1024
+        self.tree = [0] * (self.capacity + 1)
+
+    def __add(self, position, delta):
+        tree = self.tree
+        while position <= self.capacity:
+            tree[position] += delta
+            position += position & -position
+
+    def __prefix(self, position):
+        tree = self.tree
+        total = 0
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+    def __grow(self):
+        self.capacity *= 2
+        self.tree = [0] * (self.capacity + 1)
+        for position in self.last_access.values():
+            self.__add(position, 1)
+
+    def record(self, address, write=False):
+        """Registra un acceso a la palabra address"""
+        if self.accesses < len(self.log):
+            # Se vuelve a simular después de un seek
+            self.log[self.accesses] = address
+            self.log_writes[self.accesses] = write
+        else:
+            self.log.append(address)
+            self.log_writes.append(write)
+        self.accesses += 1
+        now = self.accesses
+        if now > self.capacity:
+            self.__grow()
+
+        counters = self.writes if write else self.reads
+        page = counters.get(address >> self.page_shift)
+        if page is None:
+            page = counters[address >> self.page_shift] = array(WORD_TYPECODE, bytes(4 * self.page_words))
+        page[address & self.page_mask] += 1
+
+        previous = self.last_access.get(address)
+        if previous is None:
+            self.cold += 1
+        else:
+            distance = self.__prefix(now - 1) - self.__prefix(previous)
+            self.reuse[distance.bit_length()] += 1
+            self.__add(previous, -1)
+        self.__add(now, 1)
+        self.last_access[address] = now
+
+        if self.last_address is not None:
+            self.strides[address - self.last_address] += 1
+        self.last_address = address
+
+    def seek(self, accesses):
+        """Vuelve a las estadísticas de los primeros accesos del log"""
+        if accesses == self.accesses:
+            return
+        self.__reset()
+        for address, write in zip(self.log[:accesses], self.log_writes[:accesses]):
+            self.record(address, write)
+
+    def word_counts(self, start_address, n_words, reads=True, writes=True):
+        """Accesos por palabra en [start_address, start_address + n_words)"""
+        counts = array(WORD_TYPECODE, bytes(4 * n_words))
+        sources = ([self.reads] if reads else []) + ([self.writes] if writes else [])
+        for counters in sources:
+            for index, page in counters.items():
+                base = index * self.page_words
+                first = max(base, start_address)
+                last = min(base + self.page_words, start_address + n_words)
+                for address in range(first, last):
+                    counts[address - start_address] += page[address - base]
+        return counts
+
+    def page_counts(self):
+        """Diccionario página -> (lecturas, escrituras)"""
+        pages = sorted(set(self.reads) | set(self.writes))
+        return {index: (sum(self.reads.get(index, ())), sum(self.writes.get(index, ())))
+                for index in pages}
+
+    def dump(self, filename):
+        """
+        Guarda las estadísticas en un zip de arreglos binarios little-endian:
+        meta.json, pages.i64, reads.u32, writes.u32 (palabras de cada página en
+        el orden de pages), reuse.u64, strides.i64 y stride_counts.u64
+        """
+        pages = sorted(set(self.reads) | set(self.writes))
+        empty = array(WORD_TYPECODE, bytes(4 * self.page_words))
+        reads = array(WORD_TYPECODE)
+        writes = array(WORD_TYPECODE)
+        for index in pages:
+            reads.extend(self.reads.get(index, empty))
+            writes.extend(self.writes.get(index, empty))
+        strides = sorted(self.strides)
+
+        meta = {
+            "page_words": self.page_words,
+            "accesses": self.accesses,
+            "cold": self.cold,
+            "reads": sum(reads),
+            "writes": sum(writes),
+        }
+        arrays = {
+            "pages.i64": array('q', pages),
+            "reads.u32": reads,
+            "writes.u32": writes,
+            "reuse.u64": self.reuse,
+            "strides.i64": array('q', strides),
+            "stride_counts.u64": array('Q', (self.strides[s] for s in strides)),
+        }
+        with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("meta.json", json.dumps(meta))
+            for name, values in arrays.items():
+                if sys.byteorder == 'big':
+                    values = array(values.typecode, values)
+                    values.byteswap()
+                archive.writestr(name, values.tobytes())
+
+    @staticmethod
+    def load(filename):
+        """Lee un archivo de dump(); devuelve (meta, diccionario de arreglos)"""
+        typecodes = {"i64": 'q', "u64": 'Q', "u32": WORD_TYPECODE}
+        with zipfile.ZipFile(filename) as archive:
+            meta = json.loads(archive.read("meta.json"))
+            arrays = {}
+            for name in archive.namelist():
+                if name == "meta.json":
+                    continue
+                values = array(typecodes[name.rsplit('.', 1)[1]])
+                values.frombytes(archive.read(name))
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                arrays[name.rsplit('.', 1)[0]] = values
+        return meta, arrays
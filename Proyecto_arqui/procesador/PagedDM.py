@@ -0,0 +1,170 @@
+import sys
+import mmap
+from array import array
+from DM import DM, WORD_TYPECODE
+
+# Direcciones alcanzables con registros de 32 bits
+MAX_DATA_WORDS = 1 << 32
+
+# Palabras por página: 64 KB, múltiplo de la granularidad de mmap en Linux y Windows
+PAGE_WORDS = 16384
+
+#Clase del DataMemory paginado
+# Las páginas se crean la primera vez que se escriben; leer una página que no
+# existe devuelve 0 sin reservarla. Opcionalmente las páginas viven en un
+# archivo mapeado en memoria en lugar de la RAM del proceso.
+class PagedDM(DM):
+    def __init__(self, size=MAX_DATA_WORDS, page_words=PAGE_WORDS, backing_file=None):
+        if page_words <= 0 or page_words & (page_words - 1):
+            raise ValueError("El tamaño de página debe ser una potencia de 2")
+        if size > MAX_DATA_WORDS:
+            raise ValueError(f"La memoria de datos no puede superar {MAX_DATA_WORDS} palabras")
+        self.size = size
+        self.keys = {}
+        self.page_words = page_words
+        self.page_shift = page_words.bit_length() - 1
+        self.page_mask = page_words - 1
+        self.pages = {}           # índice de página -> palabras de la página
+        self.dirty = None         # páginas escritas desde el último checkpoint
+
+        self.backing = None
+        self.maps = []
+        if backing_file is not None:
+            self.backing = open(backing_file, 'w+b')
+
+    def __new_page(self, index):
+        if self.backing is None:
+            page = array(WORD_TYPECODE, bytes(4 * self.page_words))
+        else:
+            # Cada página ocupa el siguiente bloque libre del archivo
+            page_bytes = 4 * self.page_words
+            offset = len(self.maps) * page_bytes
+            self.backing.truncate(offset + page_bytes)
+            page_map = mmap.mmap(self.backing.fileno(), page_bytes, offset=offset)
+            self.maps.append(page_map)
+            page = memoryview(page_map).cast(WORD_TYPECODE)
+        self.pages[index] = page
+        return page
+
+    def __spans(self, start_address, end_address):
+        """Divide [start_address, end_address) dentro de memoria en tramos de una página:
+        (página, desplazamiento en la página, dirección inicial, dirección final)"""
+        address = max(start_address, 0)
+        end_address = min(end_address, self.size)
+        while address < end_address:
+            index = address >> self.page_shift
+            offset = address & self.page_mask
+            span_end = min(end_address, address + self.page_words - offset)
+            yield index, offset, address, span_end
+            address = span_end
+
+    def read(self, address, mem_read=False):
+        if not mem_read:
+            return 0
+        if address < 0 or address >= self.size:
+            return 0
+        page = self.pages.get(address >> self.page_shift)
+        if page is None:
+            return 0
+        return page[address & self.page_mask]
+
+    def write(self, address, data, mem_write=False):
+        if not mem_write:
+            return
+        if address < 0 or address >= self.size:
+            return
+        page = self.pages.get(address >> self.page_shift)
+        if page is None:
+            page = self.__new_page(address >> self.page_shift)
+        page[address & self.page_mask] = data & 0xFFFFFFFF
+        if self.dirty is not None:
+            self.dirty.add(address >> self.page_shift)
+
+    def mark_dirty(self, first, last):
+        if self.dirty is not None and first < last:
+            self.dirty.update(range(first >> self.page_shift, ((last - 1) >> self.page_shift) + 1))
+
+    def export_bytes(self, start_address: int, n_words: int):
+        """Devuelve las palabras [start_address, start_address + n_words) como bytes
+        little-endian; las direcciones fuera de memoria o sin página se leen como 0"""
+        data = bytearray(4 * n_words)
+        for index, offset, first, last in self.__spans(start_address, start_address + n_words):
+            page = self.pages.get(index)
+            if page is None:
+                continue
+            words = page[offset:offset + last - first]
+            if sys.byteorder == 'big':
+                words = array(WORD_TYPECODE, words)
+                words.byteswap()
+            data[4 * (first - start_address):4 * (last - start_address)] = words
+        return bytes(data)
+
+    def extent(self):
+        if not self.pages:
+            return 0
+        return min((max(self.pages) + 1) * self.page_words, self.size)
+
+    def iter_words(self):
+        for index in sorted(self.pages):
+            base = index * self.page_words
+            for offset, value in enumerate(self.pages[index]):
+                yield base + offset, value
+
+    def store_words(self, start_address: int, words):
+        """Copia en bloque una secuencia de palabras, página por página"""
+        if not isinstance(words, array):
+            words = array(WORD_TYPECODE, (word & 0xFFFFFFFF for word in words))
+        for index, offset, first, last in self.__spans(start_address, start_address + len(words)):
+            page = self.pages.get(index)
+            if page is None:
+                page = self.__new_page(index)
+            page[offset:offset + last - first] = words[first - start_address:last - start_address]
+            self.mark_dirty(first, last)
+
+    def load_bytes(self, data, start_address: int = 0):
+        """Carga bytes como palabras little-endian a partir de start_address"""
+        if len(data) % 4:
+            # Rellenamos con ceros el último bloque si es menor a 4 bytes (padding)
+            data = bytes(data).ljust(len(data) + 4 - len(data) % 4, b'\x00')
+        words = array(WORD_TYPECODE)
+        words.frombytes(data)
+        if sys.byteorder == 'big':
+            words.byteswap()
+        self.store_words(start_address, words)
+
+    def snapshot_pages(self, indexes=None):
+        """Copia las páginas existentes: {página: bytes}; con indexes, solo esas páginas"""
+        if indexes is None:
+            indexes = self.pages
+        return {index: self.pages[index].tobytes() for index in indexes if index in self.pages}
+
+    def restore_pages(self, pages, indexes=None):
+        """Vuelve a las páginas guardadas con snapshot_pages (con indexes, solo esas
+        páginas); las creadas después quedan en cero"""
+        if indexes is None:
+            indexes = self.pages.keys() | pages.keys()
+        for index in indexes:
+            data = pages.get(index)
+            if data is None:
+                if index in self.pages:
+                    self.pages[index][:] = array(WORD_TYPECODE, bytes(4 * self.page_words))
+                continue
+            page = self.pages.get(index)
+            if page is None:
+                page = self._PagedDM__new_page(index)
+            words = array(WORD_TYPECODE)
+            words.frombytes(data)
+            page[:] = words
+
+    def close(self):
+        """Libera las páginas mapeadas y el archivo de respaldo"""
+        if self.backing is None:
+            return
+        for page in self.pages.values():
+            page.release()
+        self.pages = {}
+        for page_map in self.maps:
+            page_map.close()
+        self.maps = []
+        self.backing.close()
+        self.backing = None
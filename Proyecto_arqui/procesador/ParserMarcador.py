@@ -3,8 +3,35 @@
 # Autor: MJunaidAhmad
 # Repositorio con licencia pública. Se respetan los derechos del autor original.
 import os
+from copy import copy
 from Instruccion import instructions as inst_funcs
 from fu import FunctionalUnit, FORMAT_HEADER
+from ALU import ALU
+from SAXS import SAXS
+from MEMORY import Memory as MemUnit
+from MULT import MULT as MultUnit
+from bisect import insort
+from DIV import DIV as DivUnit
+from CycleTrace import ISSUE, READ_OPS
+
+# Clase de unidad funcional que implementa cada tipo de instrucción
+UNIT_CLASSES = {
+    'alu': ALU,
+    'saxs': SAXS,
+    'memory': MemUnit,
+    'mult': MultUnit,
+    'div': DivUnit,
+}
+
+# Entradas de reg_status: una por registro y una para el LOOP en vuelo
+REG_SLOTS = 17
+BRANCH_SLOT = 16
+
+# Registros R1-R4 que STK copia al Safe
+STK_INTERLOCK = (1, 2, 3, 4)
+
+# Etapas a las que se pueden enganchar callbacks con Scoreboard.add_hook
+HOOK_STAGES = ('issue', 'read_operands', 'execute', 'write_back', 'end_cycle')
 
 
 class ScoreboardParser:
@@ -19,14 +46,64 @@ class ScoreboardParser:
         if instruction_func is None:
             raise ValueError(f"Opcode desconocido: {opcode}")
         instruction = instruction_func(bin_instr)
-        self.sb.instructions.append(instruction)
+        self.__predecode(instruction)
+        return instruction
+
+    # Resuelve una sola vez los campos binarios a enteros y enlaza el handler
+    # de la operación, para que el ciclo del scoreboard no vuelva a parsear
+    @staticmethod
+    def __predecode(inst):
+        inst.is_branch = inst.opname == "LOOP"
+        inst.interlock = STK_INTERLOCK if inst.opname == "STK" else ()
+        inst.fi_idx = int(inst.fi, 2)
+        inst.fj_idx = int(inst.fj, 2)
+        inst.fk_idx = int(inst.fk, 2) if inst.fk is not None else None
+        if inst.is_branch:
+            inst.operand = inst.fj_idx
+        elif inst.is_imm:
+            inst.operand = inst.imm
+
+        # Entradas de reg_status que escribe y lee. El LOOP escribe su propia
+        # entrada y su campo fj es el destino del salto, no un registro
+        inst.fi_slot = BRANCH_SLOT if inst.is_branch else inst.fi_idx
+        inst.fj_slot = None if inst.is_branch else inst.fj_idx
+        inst.fk_slot = inst.fk_idx
+
+        operation = UNIT_CLASSES[inst.op].operations[inst.opname]
+        i, j, k, operand = inst.fi_idx, inst.fj_idx, inst.fk_idx, inst.operand
+
+        # Operandos con los que cada tipo de unidad recibe la instrucción
+        if inst.op == 'alu' or inst.op == 'saxs':
+            if inst.is_branch:
+                handler = lambda fu, regs: fu.run(operation, 0, regs[k], operand)
+            elif k is None:
+                handler = lambda fu, regs: fu.run(operation, regs[j], operand, j)
+            else:
+                handler = lambda fu, regs: fu.run(operation, regs[j], regs[k], j)
+        elif inst.op == 'memory':
+            handler = lambda fu, regs: fu.run(operation, regs[j], regs[k], regs[i])
+        elif k is None:
+            handler = lambda fu, regs: fu.run(operation, regs[j], operand)
+        else:
+            handler = lambda fu, regs: fu.run(operation, regs[j], regs[k])
+        inst.handler = handler
 
     # Lee el archivo binario y lo parsea
     @staticmethod
     def parse_from_memory(instr_list, sb=None):
         parser = ScoreboardParser(None, sb) if sb else ScoreboardParser(None)
         for instr_bin in instr_list:
-            parser.__parse_inst(instr_bin)
+            parser.sb.instructions.append(parser.__parse_inst(instr_bin))
+        return parser.sb
+
+    # Instrucciones de un programa ensamblado (Program): se parsean una sola
+    # vez por programa y cada scoreboard recibe copias
+    @staticmethod
+    def parse_program(program, sb=None):
+        parser = ScoreboardParser(None, sb) if sb else ScoreboardParser(None)
+        if program.decoded is None:
+            program.decoded = [parser.__parse_inst(instr_bin) for instr_bin in program.lines]
+        parser.sb.instructions.extend(copy(inst) for inst in program.decoded)
         return parser.sb
 
     
@@ -37,10 +114,18 @@ class Scoreboard:
   def __init__(self):
     self.units = []           # array of FunctionalUnit
     self.instructions = []    # array of Instruction
-    self.reg_status = {}      # register status table
+    self.reg_status = [None] * REG_SLOTS  # unit that will write each register
+    self.readers = [0] * REG_SLOTS  # operands of each register not read yet
+    self.active = []          # indexes of busy units, in unit order
+    self.free_units = {}      # unit type -> indexes of free units, in order
     self.pc = 0               # program counter
     self.clock = 1            # processor clock
     self.wait_branch = False
+    self.issue_width = 1      # instructions issued per cycle, at most
+    self.event_driven = False # skip cycles where no unit can change stage
+    self.tracer = None        # CycleTracer that records stage transitions
+    self.counters = None      # PerfCounters with cycles, retired and stall causes
+    self.hooks = {}           # stage -> callbacks registered with add_hook
 
 
   def __str__(self):
@@ -51,16 +136,88 @@ class Scoreboard:
     return result
 
 
+  """ Registers callback(sb, fu) to run after a unit goes through stage
+  (issue, read_operands, execute, write_back), or callback(sb) after each
+  tick for 'end_cycle'. The stage method is wrapped on this instance only
+  while it has callbacks, so the tick loop pays nothing without hooks"""
+  def add_hook(self, stage, callback):
+    if stage not in HOOK_STAGES:
+      raise ValueError(f"Etapa desconocida: {stage}")
+    self.hooks.setdefault(stage, []).append(callback)
+    self.__bind_hooks(stage)
+
+
+  """ Removes a callback registered with add_hook"""
+  def remove_hook(self, stage, callback):
+    self.hooks[stage].remove(callback)
+    if not self.hooks[stage]:
+      del self.hooks[stage]
+    self.__bind_hooks(stage)
+
+
+  def __bind_hooks(self, stage):
+    name = 'tick' if stage == 'end_cycle' else stage
+    callbacks = self.hooks.get(stage)
+    if not callbacks:
+      self.__dict__.pop(name, None)
+      return
+
+    method = getattr(type(self), name)
+    if stage == 'end_cycle':
+      def hooked():
+        method(self)
+        for callback in callbacks:
+          callback(self)
+    else:
+      # issue recibe (inst, fu); las demás etapas solo fu
+      def hooked(*args):
+        method(self, *args)
+        for callback in callbacks:
+          callback(self, args[-1])
+    setattr(self, name, hooked)
+
+
+  """ Builds the unit indexes from the state of the units: position of each
+  unit, free units per type, busy units, register status, pending readers
+  per register and the consumers waiting on each unit. Called once the units
+  are set, and after restoring a checkpoint"""
+  def index_units(self):
+    self.reg_status = [None] * REG_SLOTS
+    self.readers = [0] * REG_SLOTS
+    self.active = []
+    self.free_units = {}
+    for index, fu in enumerate(self.units):
+      fu.index = index
+      fu.consumers = []
+      self.free_units.setdefault(fu.type, [])
+
+    for fu in self.units:
+      if not fu.busy:
+        fu.fi_slot = fu.fj_slot = fu.fk_slot = None
+        self.free_units[fu.type].append(fu.index)
+        continue
+      inst = self.instructions[fu.inst_pc]
+      fu.fi_slot, fu.fj_slot, fu.fk_slot = inst.fi_slot, inst.fj_slot, inst.fk_slot
+      self.active.append(fu.index)
+      self.reg_status[fu.fi_slot] = fu
+      self.count_readers(fu, 1)
+      if fu.qj is not None:
+        fu.qj.consumers.append(fu)
+      if fu.qk is not None and fu.qk is not fu.qj:
+        fu.qk.consumers.append(fu)
+
+
+  """ Adds delta to the pending readers of the operands fu has not read"""
+  def count_readers(self, fu, delta):
+    if fu.rj and fu.fj_slot is not None:
+      self.readers[fu.fj_slot] += delta
+    if fu.rk and fu.fk_slot is not None:
+      self.readers[fu.fk_slot] += delta
+
+
   """ Checks to see if the scoreboard is done executing. Returns True if so"""
   def done(self):
-    done_executing = True
-    out_of_insts = not self.has_remaining_insts()
-    if out_of_insts:
-      for fu in self.units:
-        if fu.busy:
-          done_executing = False
-          break
-    return out_of_insts and done_executing
+    return not self.has_remaining_insts() and not self.active
 
 
   """ Checks to see if there are instructions left to issue to the
@@ -69,12 +226,54 @@ class Scoreboard:
     return self.pc < len(self.instructions)
 
 
-  """ Determines if an instruction is able to be issued"""
-  def can_issue(self, inst, fu):
-    if inst is None:
-      return False
-    else:
-      return inst.op == fu.type and not fu.busy and not (inst.fi in self.reg_status) and not self.wait_branch
+  """ Returns the unit that gets the next instruction this cycle: the first
+  free unit of its type, if no hazard blocks the issue"""
+  def issue_unit(self, inst):
+    if inst is None or self.wait_branch or self.reg_status[inst.fi_slot] is not None:
+      return None
+    free = self.free_units.get(inst.op)
+    return self.units[free[0]] if free else None
+
+
+  """ Returns the (instruction, unit) pairs issued this cycle: up to
+  issue_width consecutive instructions from pc, in order. Each one needs a
+  free unit not taken by the ones before it, no WAW hazard with the units in
+  flight, and no dependence (RAW, WAR or WAW) on the instructions before it
+  in the group: units other than memory read registers live while executing,
+  so the write back WAR check alone does not protect a register read in the
+  same cycle. A LOOP ends the group. Decided with the state at the start of the cycle, like the
+  single issue"""
+  def issue_group(self):
+    pc = self.pc
+    instructions = self.instructions
+    inst = instructions[pc] if pc < len(instructions) else None
+    fu = self.issue_unit(inst)
+    if fu is None:
+      return []
+    group = [(inst, fu)]
+    if self.issue_width == 1 or inst.is_branch:
+      return group
+
+    reg_status = self.reg_status
+    written = {inst.fi_slot}
+    read = {inst.fj_slot, inst.fk_slot}
+    taken = {fu.index}
+    end = min(pc + self.issue_width, len(instructions))
+    for inst in instructions[pc + 1:end]:
+      if reg_status[inst.fi_slot] is not None or inst.fi_slot in written or inst.fi_slot in read:
+        break
+      if inst.fj_slot in written or inst.fk_slot in written:
+        break
+      free = [index for index in self.free_units.get(inst.op, ()) if index not in taken]
+      if not free:
+        break
+      group.append((inst, self.units[free[0]]))
+      written.add(inst.fi_slot)
+      read.update((inst.fj_slot, inst.fk_slot))
+      taken.add(free[0])
+      if inst.is_branch:
+        break
+    return group
 
 
   """ Determines if an instruction is able to enter the read operands phase"""
@@ -85,81 +284,178 @@ class Scoreboard:
   """ Determines if an instruction is able to enter the execute phase"""
   def can_execute(self, fu):
     # check to make sure we've read operands, the functional unit
-    # is actually in use, and has clocks remaining
+    # is actually in use, and has clocks remaining. rj and rk are also down
+    # while both operands wait on their producers (qj, qk)
     if not ((not fu.rj and not fu.rk) and fu.issued()):
         return False
+    if fu.qj is not None or fu.qk is not None:
+        return False
     
     # Para la instrucción STK, verificar adicionalmente que R1-R4 estén disponibles
-    if fu.opname == "STK":
-        # Verificar que los registros R1-R4 no estén siendo escritos por otras unidades
-        for reg in ['0001', '0010', '0011', '0100']:  # Representación binaria de R1-R4
-            if reg in self.reg_status:
-                # Si alguno de los registros está siendo escrito por otra unidad, no podemos ejecutar
-                return False
+    # (fu.interlock se resuelve en el predecode)
+    for reg in fu.interlock:
+        # Si alguno de los registros está siendo escrito por otra unidad, no podemos ejecutar
+        if self.reg_status[reg] is not None:
+            return False
     
     return True
 
 
-  """ Determines if an instruction is able to enter the writeback phase"""
+  """ Determines if an instruction is able to enter the writeback phase:
+  no unit still has to read the register it writes (WAR)"""
   def can_write_back(self, fu):
-    can_write_back = False
-    for f in self.units:
-      can_write_back = (f.fj != fu.fi or not f.rj) and (f.fk != fu.fi or not f.rk)
-      if not can_write_back:
-        break
-    return can_write_back
+    return fu.busy and self.readers[fu.fi_slot] == 0
 
 
   """ Issues an instruction to the scoreboard"""
   def issue(self, inst, fu):
     fu.issue(inst, self.reg_status)
-    self.reg_status[inst.fi] = fu
+    self.count_readers(fu, 1)
+    self.reg_status[inst.fi_slot] = fu
+    self.free_units[fu.type].remove(fu.index)
+    insort(self.active, fu.index)
     self.instructions[self.pc].issue = self.clock
     fu.inst_pc = self.pc
-    if inst.opname == "LOOP":
+    if inst.is_branch:
       self.wait_branch = True
+    if self.tracer is not None:
+      self.tracer.record(self.clock, fu, ISSUE)
 
 
   """ Read operands stage of the scoreboard"""
   def read_operands(self, fu):
+    self.count_readers(fu, -1)
     fu.read_operands()
     self.instructions[fu.inst_pc].read_ops = self.clock
+    if self.tracer is not None:
+      self.tracer.record(self.clock, fu, READ_OPS)
+
+
+  """ Frees a unit after its write back: wakes up its consumers, clears its
+  register status entry and returns it to the free units"""
+  def release(self, fu):
+    fu.write_back(self.readers)
+    self.reg_status[fu.fi_slot] = None
+    self.active.remove(fu.index)
+    insort(self.free_units[fu.type], fu.index)
+    fu.clear()
+
 
   """ Tick: simulates a clock cycle in the scoreboard"""
   def tick(self):
-    # unlock all functional units
-    for fu in self.units:
-      fu.lock = False
+    units = self.units
 
     # Get the next instruction based on the PC
     next_instruction = self.instructions[self.pc] if self.has_remaining_insts() else None
 
-    for fu in self.units:
-      if self.can_issue(next_instruction, fu):
-        self.issue(next_instruction, fu)
+    # whether any unit changed stage this cycle, the units that only
+    # advanced their execute clock and the units waiting to write back
+    changed = False
+    executing = []
+    finished = []
+
+    counters = self.counters
+    if counters is not None:
+      counters.begin_cycle()
+
+    # Each issue happens at the place of its unit in unit order (busy units
+    # before it still see the old register status), keeping program order
+    group = self.issue_group()
+    issued = len(group)
+
+    for index in tuple(self.active):
+      while group and group[0][1].index < index:
+        self.issue(*group.pop(0))
         self.pc += 1
-        fu.lock = True
+        changed = True
         #print(f"[{self.clock}] Issued instruction to FU {fu.type}")
-      elif self.can_read_operands(fu):
+
+      fu = units[index]
+      if self.can_read_operands(fu):
         self.read_operands(fu)
-        fu.lock = True
+        changed = True
         #print(f"[{self.clock}] Read operands in FU {fu.type}")
       elif self.can_execute(fu):
         self.execute(fu)
-        fu.lock = True
+        if fu.clocks == 0:
+          changed = True
+        else:
+          executing.append(fu)
         #print(f"[{self.clock}] Executing in FU {fu.type}")
       elif fu.issued():
         # the functional unit is in use but can't do anything
-        fu.lock = True
+        if counters is not None:
+          self.count_stall(fu)
         #print(f"[{self.clock}] Stalled FU {fu.type}, waiting on dependencies")
-
-    for fu in self.units:
-      if not fu.lock and self.can_write_back(fu):
+      else:
+        finished.append(fu)
+
+    for inst, fu in group:
+      self.issue(inst, fu)
+      self.pc += 1
+      changed = True
+
+    if counters is not None:
+      for index in self.active:
+        counters.count(counters.busy, index)
+      counters.count(counters.issued, issued)
+      if next_instruction is not None and not issued:
+        self.count_issue_stall(next_instruction)
+
+    for fu in finished:
+      if self.can_write_back(fu):
         self.write_back(fu)
+        changed = True
+        if counters is not None:
+          counters.retired += 1
         #print(f"[{self.clock}] Wrote Back instruction to FU {fu.type}")
+      elif counters is not None:
+        counters.count(counters.stalls["write_back"], "war")
 
     self.clock += 1
 
+    if self.event_driven and not changed and executing:
+      self.skip_cycles(executing)
+
+
+  """ Attributes a stalled unit to a RAW dependency (an operand still being
+  produced) or to the STK interlock on R1-R4"""
+  def count_stall(self, fu):
+    counters = self.counters
+    if fu.qj is not None or fu.qk is not None:
+      counters.count(counters.stalls["read_operands"], "raw")
+    else:
+      counters.count(counters.stalls["execute"], "stk_interlock")
+
+
+  """ Attributes a cycle without issue to a pending branch, a WAW hazard on
+  the destination or the lack of a free unit of the instruction's type"""
+  def count_issue_stall(self, inst):
+    issue_stalls = self.counters.stalls["issue"]
+    if self.wait_branch:
+      self.counters.count(issue_stalls, "branch")
+    elif self.reg_status[inst.fi_slot] is not None:
+      self.counters.count(issue_stalls, "waw")
+    else:
+      self.counters.count(issue_stalls, "structural")
+
+
+  """ Jumps over the cycles following a cycle where no unit changed stage.
+  Those cycles repeat the same decisions and only decrement the clocks of the
+  executing units, whose intermediate execute steps are idempotent (same
+  registers, same stores), until the first unit reaches its last clock.
+  That cycle and everything after it is simulated normally, so ex_cmplt and
+  the architectural state match the step-by-step loop"""
+  def skip_cycles(self, executing):
+    skip = min(fu.clocks for fu in executing) - 1
+    if skip <= 0:
+      return
+    for fu in executing:
+      fu.clocks -= skip
+    self.clock += skip
+    if self.counters is not None:
+      self.counters.repeat(skip)
+
 
 """if __name__ == '__main__':
  #sb = ScoreboardParser.scoreboard_for_asm()
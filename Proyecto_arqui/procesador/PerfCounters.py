@@ -0,0 +1,84 @@
+import json
+
+def unit_names(units):
+    """Nombres de las unidades por tipo y orden: alu1, alu2, memory1, ..."""
+    counts = {}
+    names = []
+    for fu in units:
+        counts[fu.type] = counts.get(fu.type, 0) + 1
+        names.append(f"{fu.type}{counts[fu.type]}")
+    return names
+
+#Clase de contadores de rendimiento
+# Cuenta ciclos, instrucciones retiradas (escrituras), ciclos ocupados de cada
+# unidad y los ciclos de espera por causa:
+#   issue:         structural (no hay unidad libre del tipo), waw (el destino ya
+#                  tiene escritura pendiente), branch (LOOP en vuelo)
+#   read_operands: raw (fuente producida por otra unidad en vuelo)
+#   execute:       stk_interlock (STK esperando escrituras pendientes a R1-R4)
+#   write_back:    war (otra unidad todavía no leyó el registro destino)
+# issued cuenta los ciclos según cuántas instrucciones se emitieron en ellos
+# (de 0 a issue_width). El scoreboard anota los incrementos de cada ciclo con
+# count(); los ciclos que salta el modo por eventos repiten las mismas
+# decisiones, así que repeat() vuelve a sumar los del último ciclo.
+class PerfCounters:
+    def __init__(self, units, issue_width=1):
+        self.units = unit_names(units)
+        self.cycles = 0
+        self.retired = 0
+        self.busy = [0] * len(units)
+        self.issued = [0] * (issue_width + 1)  # ciclos por instrucciones emitidas
+        self.stalls = {
+            "issue": {"structural": 0, "waw": 0, "branch": 0},
+            "read_operands": {"raw": 0},
+            "execute": {"stk_interlock": 0},
+            "write_back": {"war": 0},
+        }
+        self.cycle = []  # (tabla, clave) incrementados en el último ciclo
+
+    def begin_cycle(self):
+        self.cycles += 1
+        self.cycle = []
+
+    def count(self, table, key):
+        table[key] += 1
+        self.cycle.append((table, key))
+
+    def repeat(self, n):
+        """Suma n veces los incrementos del último ciclo"""
+        self.cycles += n
+        for table, key in self.cycle:
+            table[key] += n
+
+    def ipc(self):
+        return self.retired / self.cycles if self.cycles else 0.0
+
+    def copy(self):
+        """Copia independiente, para guardarla en un checkpoint"""
+        other = PerfCounters([])
+        other.units = self.units
+        other.cycles = self.cycles
+        other.retired = self.retired
+        other.busy = list(self.busy)
+        other.issued = list(self.issued)
+        other.stalls = {stage: dict(causes) for stage, causes in self.stalls.items()}
+        return other
+
+    def to_dict(self):
+        return {
+            "cycles": self.cycles,
+            "retired": self.retired,
+            "ipc": self.ipc(),
+            "units": {name: {"busy": busy, "idle": self.cycles - busy,
+                             "utilization": busy / self.cycles if self.cycles else 0.0}
+                      for name, busy in zip(self.units, self.busy)},
+            "stalls": self.stalls,
+            "issue": {"width": len(self.issued) - 1,
+                      "cycles_by_issued": list(self.issued),
+                      "mean": (sum(n * cycles for n, cycles in enumerate(self.issued)) / self.cycles
+                               if self.cycles else 0.0)},
+        }
+
+    def dump(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -1,15 +1,18 @@
 #from procesador import ALU,DM,InstMem,RegisterFile
 import os
+import hashlib
 from math import ceil
-from ALU import ALU
 from RegisterFile import RegisterFile
 from Safe import Safe
 from SAXS import SAXS
 from MemoriaCentral import CentralMemory
-from ParserMarcador import ScoreboardParser,Scoreboard 
+from PagedDM import MAX_DATA_WORDS
+from Checkpoint import Checkpoints
+from CycleTrace import CycleTracer, EX_START, EX_CMPLT, WRITE_RES
+from PerfCounters import PerfCounters
+from Machine import MachineDescription
+from ParserMarcador import ScoreboardParser,Scoreboard,UNIT_CLASSES
 from MEMORY import Memory as MemUnit
-from MULT import MULT as MultUnit
-from DIV import DIV as DivUnit
 from traductor import ensamblar
 
 def save_encrypted_file(sb, data_file):    
@@ -20,18 +23,8 @@ def save_encrypted_file(sb, data_file):
         original_size = os.path.getsize(original_path)
         total_bytes = ceil(original_size / 8) * 8  # padding a múltiplo de 8
 
-        encrypted_data = bytearray()
-
-        for i in range(0, total_bytes, 8):
-            # Leer dos palabras de 32 bits (4 bytes cada una)
-            word1 = sb.memory.data_mem.read((i // 4) + 4, True)
-            word2 = sb.memory.data_mem.read((i // 4) + 5, True)
-
-            # Convertir a bytes en little-endian
-            word_bytes1 = word1.to_bytes(4, byteorder='little')
-            word_bytes2 = word2.to_bytes(4, byteorder='little')
-
-            encrypted_data.extend(word_bytes1 + word_bytes2)
+        # Palabras de 32 bits desde la dirección 4, en little-endian
+        encrypted_data = sb.memory.export_data(4, total_bytes // 4)
 
         with open(enc_path, 'wb') as f:
             f.write(encrypted_data)
@@ -40,97 +33,155 @@ def save_encrypted_file(sb, data_file):
     except Exception as e:
         print(f"Error al guardar archivo encriptado: {str(e)}")
 
+def build_unit(unit_type, latency, safe, memory, registros):
+    """Unidad funcional de un tipo de la descripción de la máquina"""
+    if unit_type == 'memory':
+        return MemUnit(safe, memory, registros, latency)
+    if unit_type == 'saxs':
+        return SAXS(safe, latency)
+    return UNIT_CLASSES[unit_type](latency)
+
 class Pipeline_marcador (Scoreboard):
-    _instance = None
-    
-    def __new__(cls, *args, **kwargs):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
     
-    def __init__(self, inst, data=None, key=None):
+    def __init__(self, inst, data=None, key=None, event_driven=False, functional=False,
+                 data_size=None, paged=False, backing_file=None, memory_stats=False,
+                 checkpoint_interval=None, trace=False, trace_file=None,
+                 perf_counters=False, machine=None, issue_width=None):
         super().__init__()
+        self.event_driven = event_driven
+        self.functional = functional  # una instrucción completa por tick, sin tiempos
+        # Mezcla de unidades, latencias y memoria (machine.json por defecto)
+        self.machine = MachineDescription.resolve(machine)
+        # Instrucciones emitidas por ciclo (la de la máquina si no se indica)
+        self.issue_width = issue_width or self.machine.issue_width
         #Estado Arquitectonico
         self.registros = RegisterFile()
         self.safe = Safe()
-        self.memory = CentralMemory(15360)
+        # Memoria de datos: plana del tamaño de la máquina, o paginada hasta lo
+        # que alcanzan los registros de 32 bits
+        if data_size is None:
+            data_size = MAX_DATA_WORDS if paged else self.machine.data_words
+        self.memory = CentralMemory(data_size, paged, backing_file)
+        if memory_stats:
+            self.memory.enable_stats()
         self.memory.load_instructions(inst)
         if data:
             self.memory.data_mem.load_file(data, start_address=4)
         if key:
             self.memory.data_mem.load_key(key, start_address=0)
-        self.scoreboard = ScoreboardParser.parse_from_memory(self.memory.inst_mem.memory, self)
-
-        #Unidades funcionales
-        self.alu1 = ALU()
-        self.alu2 = ALU()
-        self.memu1 = MemUnit(self.safe,self.memory,self.registros) 
-        self.memu2 = MemUnit(self.safe,self.memory,self.registros)
-        self.saxs = SAXS(self.safe)
-        self.mult = MultUnit()
-        self.div = DivUnit()
-
-        self.units = [
-            self.alu1,
-            self.alu2,
-            self.memu1,
-            self.memu2,
-            self.saxs,
-            self.mult, 
-            self.div
-        ]
+        self.scoreboard = ScoreboardParser.parse_program(self.memory.inst_mem.program, self)
+
+        #Unidades funcionales, en el orden de la descripción de la máquina
+        self.units = [build_unit(unit_type, latency, self.safe, self.memory, self.registros)
+                      for unit_type, latency in self.machine.units]
+        self.index_units()
+
+        # Unidad que ejecuta cada tipo de instrucción en modo funcional: la
+        # primera de su tipo
+        self.functional_units = {}
+        for fu in self.units:
+            self.functional_units.setdefault(fu.type, fu)
+        for inst in self.instructions:
+            if inst.op not in self.functional_units:
+                raise ValueError(f"La máquina no tiene unidades de tipo {inst.op} para {inst.opname}")
+            inst.latency = self.machine.latency(inst)
+
+        # Traza de etapas por ciclo, en memoria o agregada a trace_file
+        # (solo modo temporizado)
+        if trace or trace_file:
+            self.tracer = CycleTracer(self, trace_file)
+
+        # Contadores de ciclos, instrucciones retiradas y esperas por causa
+        if perf_counters:
+            self.counters = PerfCounters(self.units, self.issue_width)
+
+        # Checkpoints para volver a ciclos anteriores (None: desactivados)
+        self.checkpoints = None
+        if checkpoint_interval:
+            self.checkpoints = Checkpoints(self, checkpoint_interval)
+
+    """ Releases the data memory (mapped pages and backing file) and flushes
+    the trace. The simulator can be used as a context manager that closes it"""
+    def close(self):
+        if self.tracer is not None:
+            self.tracer.close()
+        self.memory.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    """ Tick: one clock cycle of the scoreboard, or one whole instruction in
+    functional mode"""
+    def tick(self):
+        if self.functional:
+            self.step()
+        else:
+            super().tick()
+        if self.checkpoints is not None and self.clock >= self.checkpoints.next_clock:
+            self.checkpoints.take()
+
+    """ Returns to clock cycle `clock`, restoring the nearest earlier checkpoint
+    and replaying from there. Needs checkpoint_interval"""
+    def goto(self, clock):
+        if self.checkpoints is None:
+            raise RuntimeError("Los checkpoints no están activos (checkpoint_interval)")
+        self.checkpoints.goto(clock)
+
+    """ Steps back n clock cycles (n instructions in functional mode)"""
+    def step_back(self, n=1):
+        self.goto(max(self.clock - n, 1))
+
+    """ Runs the simulation until every instruction has finished"""
+    def run(self):
+        if self.functional and self.checkpoints is None:
+            n_insts = len(self.instructions)
+            while self.pc < n_insts:
+                self.step()
+        while not self.done():
+            self.tick()
+        if self.tracer is not None:
+            self.tracer.flush()
+
+    """ Functional mode: executes the instruction at pc with the same unit
+    operations as the scoreboard, but in program order and without timing.
+    clock counts executed instructions"""
+    def step(self):
+        inst = self.instructions[self.pc]
+        fu = self.functional_units[inst.op]
+
+        # Ejecuta la operación como en su primer ciclo de ejecución
+        fu.start(inst.latency)
+        result = inst.handler(fu, self.registros.regs)
+        inst.result = result
+
+        self.pc += 1
+        if inst.fi and result is not None and fu.zero_flag == False:
+            self.registros.regs[inst.fi_idx] = result & 0xFFFFFFFF
+        elif fu.zero_flag == True:
+            self.pc = result
+            fu.zero_flag = False
+        self.clock += 1
+        if self.counters is not None:
+            self.counters.begin_cycle()
+            self.counters.retired += 1
+            self.counters.issued[1] += 1
     
     """ Execute stage of the scoreboard"""
     def execute(self, fu):
         inst = self.instructions[fu.inst_pc]
- 
-        fj_val = None
-        fk_val = None 
 
-        if inst.fi is not None:
-            fi_index = int(fu.fi, 2)
-            fi_val = self.registros.regs[fi_index]
-        else:
-            fi_index = 0
-
-        if inst.fj is not None:
-            fj_index = int(inst.fj, 2)
-            if inst.opname != "LOOP":
-                fj_val = self.registros.regs[fj_index]
-            else:
-                fj_val = 0
-        
-        if inst.fk is not None:
-            fk_index = int(inst.fk, 2)
-            fk_val = self.registros.regs[fk_index]
-        elif inst.is_imm:
-            fk_val = inst.imm   
-
-        if (fu.type == "alu" or fu.type == "saxs"):
-            result = fu.execute(inst.opname, fj_val, fk_val, fj_index)
-            inst.result = result
-        elif (fu.type == "memory"):
-            result = fu.execute(inst.opname, fj_val, fk_val, fi_val)
-            inst.result = result
-        else:
-            result = fu.execute(inst.opname, fj_val, fk_val)
-            inst.result = result
+        # El handler predecodificado toma los operandos y ejecuta la operación
+        inst.result = inst.handler(fu, fu.operand_registers(self.registros.regs))
 
-        
-        """print(
-            f"Name: {inst.opname}",
-            f"Is Imm: {inst.is_imm}",
-            f"Imm: {inst.imm}",
-            f"Clock: {fu.clocks}",
-            f"fi_reg: {fi_index}",
-            f"fj_val: {fj_val}",
-            f"fk_val: {fk_val}",
-            f"result: {inst.result}",
-        )"""
-        
-        
+        if self.tracer is not None and fu.first_clock():
+            self.tracer.record(self.clock, fu, EX_START)
         if fu.clocks == 0:
-            self.instructions[fu.inst_pc].ex_cmplt = self.clock
+            inst.ex_cmplt = self.clock
+            if self.tracer is not None:
+                self.tracer.record(self.clock, fu, EX_CMPLT)
 
     
     """ Writeback stage of the scoreboard"""
@@ -138,8 +189,7 @@ class Pipeline_marcador (Scoreboard):
         inst = self.instructions[fu.inst_pc]
 
         if inst.fi and inst.result is not None and fu.zero_flag == False:
-            fi_index = int(inst.fi, 2)
-            self.registros.regs[fi_index] = inst.result & 0xFFFFFFFF
+            self.registros.regs[inst.fi_idx] = inst.result & 0xFFFFFFFF
         elif (fu.zero_flag == True):
             self.pc = inst.result
             fu.zero_flag = False
@@ -150,12 +200,52 @@ class Pipeline_marcador (Scoreboard):
         
 
         #Write back confirmation 
-        fu.write_back(self.units)
         self.instructions[fu.inst_pc].write_res = self.clock
-        # clear out the result register status
-        del self.reg_status[fu.fi]
-        fu.clear()
+        if self.tracer is not None:
+            self.tracer.record(self.clock, fu, WRITE_RES)
+        # wake up the consumers and clear out the result register status
+        self.release(fu)
     
+def memory_digest(memory):
+    """SHA-256 de la memoria de datos (hasta su última página usada si es paginada),
+    palabras de 32 bits en little-endian"""
+    return hashlib.sha256(memory.export_data(0, memory.data_mem.extent())).hexdigest()
+
+def run_job(program, data=None, key=None, **options):
+    """
+    Corre una simulación completa y resume su estado final
+    :param options: argumentos de Pipeline_marcador (event_driven activo por defecto);
+        con perf_counters=True el resultado incluye los contadores
+    """
+    options.setdefault("event_driven", True)
+    result = {"program": str(program), "data": data, "key": key}
+    try:
+        with Pipeline_marcador(program, data, key, **options) as sb:
+            sb.run()
+            result["cycles"] = sb.clock - 1
+            result["registers"] = list(sb.registros.regs)
+            result["memory_digest"] = memory_digest(sb.memory)
+            if sb.counters is not None:
+                result["counters"] = sb.counters.to_dict()
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+def run_batch(jobs, workers=None, **options):
+    """
+    Corre varios trabajos (program, data, key) en paralelo, un proceso por simulación
+    :param jobs: iterable de tuplas (program, data, key); data y key son opcionales
+    :param workers: cantidad de procesos (por defecto, uno por núcleo)
+    :param options: argumentos de Pipeline_marcador para todos los trabajos, p. ej.
+        functional=True (cycles cuenta instrucciones) o paged=True
+    :return: lista de resultados de run_job en el mismo orden que jobs
+    """
+    # Se importa aquí: cargar multiprocessing demora el arranque de cada simulación
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_job, *job, **options) for job in jobs]
+        return [future.result() for future in futures]
+
 # Obtener el directorio del script actual
 """script_dir = os.path.dirname(os.path.abspath(__file__))
 
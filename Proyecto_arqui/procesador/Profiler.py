@@ -0,0 +1,82 @@
+from time import perf_counter_ns
+
+# Etapas del scoreboard que se miden por unidad funcional
+PROFILED_STAGES = ('issue', 'read_operands', 'execute', 'write_back')
+
+#Clase de perfil de tiempo del simulador
+# Mide el tiempo de reloj de pared (del host) que pasa en cada etapa del
+# scoreboard, separado por tipo de unidad funcional (y por operación en
+# execute), más el resto de cada tick: las decisiones de issue_group,
+# can_read_operands, can_execute y can_write_back. Envuelve los métodos de
+# etapa de la instancia igual que Scoreboard.add_hook; si hay hooks, se
+# registran antes de attach(). El resultado sale en formato de pilas
+# colapsadas (una línea "tick;etapa;unidad microsegundos"), que leen
+# flamegraph.pl, speedscope e inferno.
+class StageProfiler:
+    def __init__(self, sb):
+        self.sb = sb
+        self.times = {}      # pila -> nanosegundos
+        self.saved = None    # atributos de la instancia antes de attach
+
+    def attach(self):
+        sb = self.sb
+        self.saved = {name: sb.__dict__.get(name) for name in PROFILED_STAGES + ('tick',)}
+        times = self.times
+        stage_time = [0]     # tiempo de etapas dentro del tick en curso
+
+        for stage in PROFILED_STAGES:
+            method = getattr(sb, stage)
+            if stage == 'execute':
+                def timed(fu, method=method, stage=stage):
+                    opname = sb.instructions[fu.inst_pc].opname
+                    start = perf_counter_ns()
+                    method(fu)
+                    elapsed = perf_counter_ns() - start
+                    key = f"tick;{stage};{fu.type};{opname}"
+                    times[key] = times.get(key, 0) + elapsed
+                    stage_time[0] += elapsed
+            else:
+                def timed(*args, method=method, stage=stage):
+                    fu = args[-1]  # issue recibe (inst, fu)
+                    start = perf_counter_ns()
+                    method(*args)
+                    elapsed = perf_counter_ns() - start
+                    key = f"tick;{stage};{fu.type}"
+                    times[key] = times.get(key, 0) + elapsed
+                    stage_time[0] += elapsed
+            setattr(sb, stage, timed)
+
+        tick = sb.tick
+        def timed_tick():
+            stage_time[0] = 0
+            start = perf_counter_ns()
+            tick()
+            elapsed = perf_counter_ns() - start - stage_time[0]
+            times["tick"] = times.get("tick", 0) + elapsed
+        sb.tick = timed_tick
+        return self
+
+    def detach(self):
+        """Devuelve los métodos de etapa a como estaban antes de attach()"""
+        for name, value in self.saved.items():
+            if value is None:
+                self.sb.__dict__.pop(name, None)
+            else:
+                setattr(self.sb, name, value)
+        self.saved = None
+
+    def total_ns(self):
+        return sum(self.times.values())
+
+    def collapsed(self, prefix=None):
+        """Líneas en formato de pilas colapsadas, en microsegundos"""
+        lines = []
+        for stack, ns in sorted(self.times.items()):
+            if ns >= 1000:
+                lines.append(f"{prefix + ';' if prefix else ''}{stack} {ns // 1000}")
+        return lines
+
+    def dump(self, filename, prefix=None):
+        with open(filename, 'w') as f:
+            for line in self.collapsed(prefix):
+                f.write(line + '\n')
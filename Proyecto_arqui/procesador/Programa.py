@@ -0,0 +1,97 @@
+import sys
+import struct
+from array import array
+from DM import WORD_TYPECODE
+
+# Identificador y versión del formato binario empaquetado
+PROGRAM_MAGIC = b'SBPO'
+PROGRAM_VERSION = 1
+
+# Bits de cada instrucción codificada
+WORD_BITS = 21
+
+# Extensión de los programas empaquetados (también en la caché del ensamblador)
+PROGRAM_EXTENSION = ".sbo"
+
+#Clase de programa ensamblado
+# Guarda las instrucciones codificadas como enteros de 21 bits, listas para
+# Pipeline_marcador sin pasar por archivos. El formato empaquetado es una
+# cabecera (PROGRAM_MAGIC, versión, cantidad de instrucciones y el SHA-256 de
+# la fuente, o ceros) seguida de una palabra de 32 bits en little-endian por
+# instrucción. ScoreboardParser guarda en decoded las instrucciones
+# predecodificadas la primera vez que se simula el programa; las simulaciones
+# siguientes reciben copias sin volver a parsear.
+class Program:
+    def __init__(self, words, name=None, source_hash=None, lines=None):
+        self.words = array(WORD_TYPECODE, words)
+        self.name = name                # archivo fuente, si lo hay
+        self.source_hash = source_hash  # SHA-256 de la fuente (bytes)
+        self.decoded = None             # instrucciones predecodificadas
+        self.__lines = lines            # texto '0'/'1', si ya se tiene
+
+    @staticmethod
+    def from_lines(lines, name=None, source_hash=None):
+        """Programa a partir de instrucciones en texto '0'/'1'"""
+        lines = [line.strip() for line in lines if line.strip()]
+        words = []
+        for line in lines:
+            if len(line) != WORD_BITS or line.strip('01'):
+                raise ValueError(f"Instrucción binaria inválida: {line}")
+            words.append(int(line, 2))
+        return Program(words, name, source_hash, lines)
+
+    @property
+    def lines(self):
+        """Instrucciones en texto '0'/'1', como las guarda la memoria de instrucciones"""
+        if self.__lines is None:
+            self.__lines = [format(word, f'0{WORD_BITS}b') for word in self.words]
+        return self.__lines
+
+    def __len__(self):
+        return len(self.words)
+
+    def __str__(self):
+        return self.name or f"<programa de {len(self)} instrucciones>"
+
+    # Las instrucciones predecodificadas tienen handlers que no se pueden
+    # serializar: las copias para otros procesos vuelven a parsear
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['decoded'] = None
+        return state
+
+    def save(self, filename):
+        """Escribe el programa en formato empaquetado"""
+        words = self.words
+        if sys.byteorder == 'big':
+            words = array(words.typecode, words)
+            words.byteswap()
+        with open(filename, 'wb') as f:
+            f.write(PROGRAM_MAGIC + struct.pack('<II', PROGRAM_VERSION, len(words)))
+            f.write(self.source_hash or bytes(32))
+            words.tofile(f)
+
+    @staticmethod
+    def is_packed(filename):
+        with open(filename, 'rb') as f:
+            return f.read(len(PROGRAM_MAGIC)) == PROGRAM_MAGIC
+
+    @staticmethod
+    def load(filename, name=None):
+        """Lee un programa empaquetado"""
+        with open(filename, 'rb') as f:
+            if f.read(4) != PROGRAM_MAGIC:
+                raise ValueError(f"{filename} no es un programa empaquetado")
+            version, count = struct.unpack('<II', f.read(8))
+            if version != PROGRAM_VERSION:
+                raise ValueError(f"Versión de programa no soportada: {version}")
+            source_hash = f.read(32)
+            words = array(WORD_TYPECODE)
+            words.frombytes(f.read(4 * count))
+        if len(words) != count:
+            raise ValueError(f"{filename} está truncado")
+        if sys.byteorder == 'big':
+            words.byteswap()
+        if any(word >> WORD_BITS for word in words):
+            raise ValueError(f"{filename} tiene instrucciones de más de {WORD_BITS} bits")
+        return Program(words, name or filename, source_hash if any(source_hash) else None)
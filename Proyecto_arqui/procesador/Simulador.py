@@ -0,0 +1,156 @@
+import os
+import sys
+import json
+import time
+import argparse
+from math import ceil
+from contextlib import redirect_stdout
+from Pipeline import Pipeline_marcador, memory_digest
+from Tomasulo import Pipeline_tomasulo
+from Programa import Program
+from traductor import ensamblar
+from Ensamblador import IncrementalAssembler
+
+# Corre una simulación sin interfaz gráfica y escribe sus estadísticas en JSON
+# por la salida estándar. Desde esta carpeta (o con ella en PYTHONPATH):
+#
+#     python -m Simulador Encriptación.txt --data jorge_luis.txt --key key.txt
+#     python -m Simulador Desencriptar.txt --data jorge_luis.enc --key key.txt \
+#         --output jorge_luis.dec --functional
+#     python -m Simulador Encriptación.txt --data jorge_luis.txt --key key.txt \
+#         --engine both --no-output
+#
+# El programa puede ser código fuente o un programa empaquetado (.sbo). La
+# salida son los datos procesados desde la dirección 4, con el tamaño de la
+# entrada redondeado a bloques de 8 bytes; por defecto se escribe junto a los
+# datos con extensión .enc, como en el IDE. Con --engine both se corren el
+# scoreboard y el motor de Tomasulo sobre la misma entrada; las estadísticas
+# traen los ciclos de cada uno y si llegaron al mismo resultado, y la salida
+# es la del scoreboard.
+
+ENGINES = ("scoreboard", "tomasulo")
+
+def load_program(filename, cache_dir=None):
+    """Programa empaquetado o, si no, código fuente a ensamblar; ValueError con
+    la línea del primer error de la fuente"""
+    if Program.is_packed(filename):
+        return Program.load(filename)
+    try:
+        return ensamblar(filename, directorio_cache=cache_dir)
+    except (KeyError, IndexError, ValueError) as e:
+        # El ensamblador incremental da los mismos errores con su línea
+        with open(filename) as f:
+            assembler = IncrementalAssembler(f.read(), filename)
+        if assembler.n_errors:
+            line, error = assembler.line_errors()[0]
+            raise ValueError(f"{filename}, línea {line + 1}: {error}") from e
+        raise ValueError(f"{filename}: {e}") from e
+
+def write_output(sb, data_file, output_file):
+    """Escribe los datos procesados; devuelve la cantidad de bytes"""
+    total_bytes = ceil(os.path.getsize(data_file) / 8) * 8  # padding a múltiplo de 8
+    with open(output_file, 'wb') as f:
+        f.write(sb.memory.export_data(4, total_bytes // 4))
+    return total_bytes
+
+def simulate(engine, program, data, key, args):
+    """(simulador ya corrido, segundos) con el motor dado"""
+    # Los avisos de carga no deben mezclarse con el JSON de la salida estándar
+    with redirect_stdout(sys.stderr):
+        if engine == "tomasulo":
+            sb = Pipeline_tomasulo(program, data, key, machine=args.machine,
+                                   issue_width=args.issue_width)
+        else:
+            sb = Pipeline_marcador(program, data, key, event_driven=True,
+                                   functional=args.functional, machine=args.machine,
+                                   issue_width=args.issue_width,
+                                   perf_counters=args.counters)
+    start = time.perf_counter()
+    try:
+        sb.run()
+    except BaseException:
+        sb.close()
+        raise
+    return sb, time.perf_counter() - start
+
+def engine_stats(engine, sb, seconds):
+    stats = {
+        "engine": engine,
+        "cycles": sb.clock - 1,
+        "seconds": seconds,
+        "registers": list(sb.registros.regs),
+        "memory_digest": memory_digest(sb.memory),
+    }
+    if engine == "tomasulo":
+        stats["tomasulo"] = sb.to_dict()
+    elif sb.counters is not None:
+        stats["counters"] = sb.counters.to_dict()
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Simulador",
+                                     description="Simulador del procesador sin interfaz gráfica")
+    parser.add_argument("program", help="código fuente o programa empaquetado (.sbo)")
+    parser.add_argument("--data", help="archivo de datos, se carga desde la dirección 4")
+    parser.add_argument("--key", help="llave de 128 bits en hexadecimal")
+    parser.add_argument("--output", help="archivo de salida (por defecto, datos con extensión .enc)")
+    parser.add_argument("--no-output", action="store_true", help="no escribir la salida")
+    parser.add_argument("--functional", action="store_true",
+                        help="modo funcional: una instrucción por paso, sin tiempos")
+    parser.add_argument("--engine", choices=ENGINES + ("both",), default="scoreboard",
+                        help="motor de ejecución; both corre los dos y compara los ciclos")
+    parser.add_argument("--machine", help="descripción de la máquina (.json o .toml)")
+    parser.add_argument("--issue-width", type=int,
+                        help="instrucciones emitidas por ciclo (por defecto, las de la máquina)")
+    parser.add_argument("--counters", action="store_true",
+                        help="incluye los contadores de rendimiento en las estadísticas")
+    parser.add_argument("--cache", metavar="DIRECTORIO",
+                        help="caché de programas ensamblados entre corridas")
+    args = parser.parse_args(argv)
+    if args.functional and args.engine != "scoreboard":
+        parser.error("--functional solo se puede usar con el scoreboard")
+    engines = ENGINES if args.engine == "both" else (args.engine,)
+    # DM resuelve las rutas relativas desde la carpeta del simulador
+    data = os.path.abspath(args.data) if args.data else None
+    key = os.path.abspath(args.key) if args.key else None
+
+    # Las simulaciones se cierran al terminar, también si otra falla: la
+    # memoria paginada puede tener páginas mapeadas y un archivo de respaldo
+    # abiertos. Cualquier error de carga o de simulación se informa sin traza
+    runs = []
+    try:
+        program = load_program(args.program, args.cache)
+        for engine in engines:
+            runs.append((engine,) + simulate(engine, program, data, key, args))
+
+        engine, sb, seconds = runs[0]
+        stats = {
+            "program": args.program,
+            "mode": "functional" if args.functional else "timed",
+            **engine_stats(engine, sb, seconds),
+        }
+        if len(runs) > 1:
+            stats["engines"] = [engine_stats(*run) for run in runs]
+            stats["cycles_by_engine"] = {engine: other.clock - 1 for engine, other, _ in runs}
+            stats["same_result"] = all(
+                other.registros.regs == sb.registros.regs
+                and memory_digest(other.memory) == stats["memory_digest"]
+                for _, other, _ in runs[1:])
+
+        if args.data and not args.no_output:
+            output = args.output or os.path.splitext(args.data)[0] + ".enc"
+            stats["output"] = output
+            stats["output_bytes"] = write_output(sb, data, output)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        for _, sb, _ in runs:
+            sb.close()
+
+    json.dump(stats, sys.stdout, indent=2)
+    print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,245 @@
+import os
+import sys
+import csv
+import copy
+import json
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from Pipeline import run_job
+from Machine import MachineDescription, DEFAULT_MACHINE
+from ParserMarcador import UNIT_CLASSES
+from traductor import ensamblar
+
+# Barridos de diseño: corre cada combinación de parámetros de máquina con cada
+# programa, en paralelo, y resume ciclos, IPC y utilización por tipo de unidad.
+#
+# Archivo de barrido (JSON):
+#     {
+#         "base": "machine.json",
+#         "parameters": {
+#             "units.saxs.count": [1, 2],
+#             "units.saxs.latency": [2, 4],
+#             "units.memory.count": [1, 2],
+#             "opcode_latency.DIV": [20, 40]
+#         },
+#         "programs": [
+#             {"name": "encriptar", "source": "Encriptación.txt",
+#              "data": "jorge_luis.txt", "key": "key.txt"}
+#         ],
+#         "objectives": ["cycles", "units", "latency", "issue_width"]
+#     }
+#
+# Parámetros: units.<tipo>.count, units.<tipo>.latency (también cambia la
+# latencia de los opcodes de ese tipo que estén en opcode_latency),
+# opcode_latency.<OPCODE>, data_words e issue_width. Las rutas relativas se
+# resuelven desde la carpeta del archivo de barrido. Cada corrida se compara
+# con una referencia fija: el modo funcional en la máquina por defecto (con
+# el mismo tamaño de memoria), no en la máquina que se está probando.
+#
+# El frente de Pareto se calcula con los objetivos de "objectives" (todos los
+# de OBJECTIVES si no se indican): ciclos totales, cantidad de unidades, suma
+# de las latencias de los opcodes e instrucciones emitidas por ciclo. Unidades
+# más rápidas y una emisión más ancha cuestan hardware, así que la latencia se
+# maximiza y lo demás se minimiza.
+
+# Objetivo -> (valor de una configuración a partir de sus filas de la tabla,
+# True si se minimiza o False si se maximiza)
+OBJECTIVES = {
+    "cycles": (lambda rows: sum(row["cycles"] for row in rows), True),
+    "units": (lambda rows: rows[0]["units"], True),
+    "latency": (lambda rows: rows[0]["latency"], False),
+    "issue_width": (lambda rows: rows[0]["issue_width"], True),
+}
+
+def apply_parameters(base, parameters):
+    """Copia de la descripción base (diccionario) con los parámetros aplicados"""
+    machine = copy.deepcopy(base)
+    for path, value in parameters.items():
+        parts = path.split('.')
+        if parts[0] == 'units' and len(parts) == 3 and parts[2] in ('count', 'latency'):
+            entries = [entry for entry in machine.get("units", ()) if entry.get("type") == parts[1]]
+            if not entries:
+                raise ValueError(f"La máquina base no tiene unidades de tipo {parts[1]}")
+            for entry in entries:
+                entry[parts[2]] = value
+            if parts[2] == 'latency':
+                opcode_latency = machine.get("opcode_latency", {})
+                for opname in UNIT_CLASSES[parts[1]].operations:
+                    if opname in opcode_latency:
+                        opcode_latency[opname] = value
+        elif parts[0] == 'opcode_latency' and len(parts) == 2:
+            machine.setdefault("opcode_latency", {})[parts[1]] = value
+        elif path in ('data_words', 'issue_width'):
+            machine[path] = value
+        else:
+            raise ValueError(f"Parámetro desconocido: {path}")
+    # Valida antes de repartir los trabajos
+    MachineDescription(machine)
+    return machine
+
+def total_latency(machine):
+    """Suma de la latencia de cada opcode en una descripción de máquina"""
+    unit_latency = {}
+    for unit_type, latency in machine.units:
+        unit_latency.setdefault(unit_type, latency)
+    total = 0
+    for unit_type, unit_class in UNIT_CLASSES.items():
+        for opname in unit_class.operations:
+            latency = machine.opcode_latency.get(opname, unit_latency.get(unit_type))
+            if latency is not None:
+                total += latency
+    return total
+
+def objective_values(rows, objectives):
+    """Valores de los objetivos de una configuración, en el orden dado"""
+    return tuple(OBJECTIVES[name][0](rows) for name in objectives)
+
+def grid(parameters):
+    """Todas las combinaciones de un diccionario parámetro -> lista de valores"""
+    names = list(parameters)
+    for values in itertools.product(*(parameters[name] for name in names)):
+        yield dict(zip(names, values))
+
+def run_reference(program, data, key, data_words):
+    """Memoria final de referencia: modo funcional en la máquina por defecto"""
+    reference = run_job(program, data, key, functional=True, data_size=data_words)
+    if "error" in reference:
+        raise ValueError(f"{program}: la referencia no corre: {reference['error']}")
+    return reference["memory_digest"]
+
+def run_point(program, data, key, machine, reference):
+    """
+    Corre un programa en una máquina en modo temporizado con contadores;
+    correct indica si la memoria final coincide con la referencia
+    """
+    timed = run_job(program, data, key, machine=machine, perf_counters=True)
+    if "error" in timed:
+        return timed
+    timed["correct"] = timed["memory_digest"] == reference
+    return timed
+
+def pareto_front(points):
+    """
+    Índices de los puntos no dominados al minimizar todas sus coordenadas
+    :param points: lista de tuplas de objetivos
+    """
+    front = []
+    for i, p in enumerate(points):
+        dominated = any(all(a <= b for a, b in zip(q, p)) and q != p for q in points)
+        if not dominated:
+            front.append(i)
+    return front
+
+def sweep(spec, workers=None, base_dir="."):
+    """
+    Corre un barrido
+    :param spec: diccionario con base, parameters, programs y objectives (ver arriba)
+    :return: (filas de la tabla, índices de las configuraciones del frente de
+        Pareto en los objetivos, configuraciones)
+    """
+    objectives = spec.get("objectives", list(OBJECTIVES))
+    for name in objectives:
+        if name not in OBJECTIVES:
+            raise ValueError(f"Objetivo desconocido: {name}")
+
+    base = spec.get("base", DEFAULT_MACHINE)
+    if not isinstance(base, dict):
+        with open(os.path.join(base_dir, base)) as f:
+            base = json.load(f)
+    configs = [(parameters, apply_parameters(base, parameters))
+               for parameters in grid(spec.get("parameters", {}))]
+
+    def resolve(path):
+        return os.path.abspath(os.path.join(base_dir, path)) if path else None
+
+    # Cada programa se ensambla una sola vez para todas las configuraciones
+    programs = []
+    for entry in spec["programs"]:
+        name = entry.get("name", os.path.splitext(os.path.basename(entry["source"]))[0])
+        programs.append((name, ensamblar(resolve(entry["source"])),
+                         resolve(entry.get("data")), resolve(entry.get("key"))))
+
+    sizes = [MachineDescription(machine).data_words for _, machine in configs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Una referencia por programa y tamaño de memoria
+        references = {(name, size): pool.submit(run_reference, program, data, key, size)
+                      for size in set(sizes) for name, program, data, key in programs}
+        references = {point: future.result() for point, future in references.items()}
+        futures = [(c, name, pool.submit(run_point, program, data, key, machine,
+                                         references[name, sizes[c]]))
+                   for c, (parameters, machine) in enumerate(configs)
+                   for name, program, data, key in programs]
+        results = [(c, name, future.result()) for c, name, future in futures]
+
+    rows = []
+    for c, name, result in results:
+        parameters, machine = configs[c]
+        row = {"config": c, **parameters, "program": name}
+        description = MachineDescription(machine)
+        row["units"] = len(description.units)
+        row["latency"] = total_latency(description)
+        row["issue_width"] = description.issue_width
+        if "error" in result:
+            row["error"] = result["error"]
+            rows.append(row)
+            continue
+        counters = result["counters"]
+        row["cycles"] = result["cycles"]
+        row["retired"] = counters["retired"]
+        row["ipc"] = round(counters["ipc"], 4)
+        # Utilización media de las unidades de cada tipo
+        by_type = {}
+        for unit, values in counters["units"].items():
+            by_type.setdefault(unit.rstrip("0123456789"), []).append(values["utilization"])
+        for unit_type, values in by_type.items():
+            row[f"util_{unit_type}"] = round(sum(values) / len(values), 4)
+        row["correct"] = result["correct"]
+        rows.append(row)
+
+    # Frente de Pareto entre las configuraciones que corrieron bien en todos
+    # los programas, con los objetivos a maximizar cambiados de signo
+    candidates = []
+    for c in range(len(configs)):
+        config_rows = [row for row in rows if row["config"] == c]
+        if all(row.get("correct") for row in config_rows):
+            values = objective_values(config_rows, objectives)
+            candidates.append((c, tuple(value if OBJECTIVES[name][1] else -value
+                                        for name, value in zip(objectives, values))))
+    front = [candidates[i][0] for i in pareto_front([costs for _, costs in candidates])]
+    return rows, front, configs
+
+def write_csv(rows, filename):
+    columns = []
+    for row in rows:
+        for column in row:
+            if column not in columns:
+                columns.append(column)
+    with open(filename, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Barridos de diseño del procesador")
+    parser.add_argument("spec", help="archivo JSON del barrido")
+    parser.add_argument("--output", default="sweep.csv", help="tabla de resultados CSV")
+    parser.add_argument("--workers", type=int, help="procesos (por defecto, uno por núcleo)")
+    args = parser.parse_args(argv)
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+    rows, front, configs = sweep(spec, args.workers, os.path.dirname(os.path.abspath(args.spec)))
+    write_csv(rows, args.output)
+
+    objectives = spec.get("objectives", list(OBJECTIVES))
+    print(f"{len(rows)} corridas en {args.output}")
+    print(f"Frente de Pareto ({', '.join(objectives)}):")
+    for c in front:
+        config_rows = [row for row in rows if row["config"] == c]
+        values = objective_values(config_rows, objectives)
+        print(f"  config {c}: {', '.join(map(str, values))}, {configs[c][0]}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+from RegisterFile import RegisterFile
+from Safe import Safe
+from MemoriaCentral import CentralMemory
+from PagedDM import MAX_DATA_WORDS
+from Machine import MachineDescription
+from ParserMarcador import ScoreboardParser, STK_INTERLOCK
+from EstacionReserva import ReservationStation, EXECUTING, DONE
+from Pipeline import build_unit
+
+# Estaciones de reserva por unidad de cada tipo cuando la máquina no las indica
+STATIONS_PER_UNIT = 2
+
+# Opcodes que leen o escriben memoria de datos y el Safe
+MEMORY_READS = ('LOAD',)
+MEMORY_WRITES = ('STOR',)
+SAFE_READS = ('SAXS',)
+SAFE_WRITES = ('STK',)
+
+def operand_registers(inst):
+    """Registros cuyo valor necesita la instrucción para ejecutarse"""
+    j, k, i = inst.fj_idx, inst.fk_idx, inst.fi_idx
+    if inst.is_branch:
+        return (k,)
+    if inst.op == 'memory':
+        if inst.opname == 'LOAD':
+            return (j,)                      # la carga no usa el desplazamiento
+        if inst.opname == 'STOR':
+            return (j, k, i)
+        if inst.opname == 'STK':
+            return (i,) + STK_INTERLOCK
+        return (i,)                          # DLT
+    return (j,) if k is None else (j, k)
+
+def writes_register(inst):
+    """Determina si la instrucción escribe su registro destino"""
+    return not inst.is_branch and inst.opname not in MEMORY_WRITES + SAFE_WRITES
+
+def conflicts(older, younger):
+    """
+    Determina si dos instrucciones deben ejecutarse en orden porque comparten
+    estado que no se renombra: memoria de datos (una escritura con cualquier
+    acceso) o el Safe (STK con SAXS o con otro STK)
+    """
+    a, b = older.opname, younger.opname
+    if a in MEMORY_WRITES and b in MEMORY_READS + MEMORY_WRITES:
+        return True
+    if b in MEMORY_WRITES and a in MEMORY_READS:
+        return True
+    if a in SAFE_WRITES and b in SAFE_READS + SAFE_WRITES:
+        return True
+    return b in SAFE_WRITES and a in SAFE_READS
+
+#Clase de motor de Tomasulo
+# Alternativa a Pipeline_marcador con el mismo programa, la misma memoria y
+# las mismas unidades funcionales (ALU, MULT, DIV, MEMORY, SAXS). Cada ciclo:
+#   1. Despacho y ejecución: cada unidad libre toma la estación lista más
+#      antigua de su tipo (operandos recibidos en ciclos anteriores) y cada
+#      unidad ocupada ejecuta un ciclo con el handler predecodificado, que lee
+#      los operandos de la estación. Al terminar, la unidad queda libre para
+#      el ciclo siguiente y el resultado espera en la estación.
+#   2. Emisión: hasta issue_width instrucciones en orden, cada una a una
+#      estación libre de su tipo. Los operandos se copian del banco de
+#      registros o se enlazan a la estación que los produce (renombre con
+#      register_status), así que no hay esperas por WAW ni por WAR. Un LOOP
+#      detiene la emisión hasta resolverse, como en el scoreboard.
+#   3. Escritura: la estación terminada más antigua que escribe un registro
+#      usa el bus común de datos (uno por ciclo): despierta a sus consumidores
+#      y escribe el banco de registros si sigue siendo el último productor del
+#      registro. STOR, STK y LOOP no usan el bus y se retiran todos juntos.
+# Los accesos a memoria y al Safe no se renombran: una instrucción no se
+# despacha mientras una anterior con la que está en conflicto (ver conflicts)
+# no haya terminado de ejecutar.
+class Pipeline_tomasulo:
+    def __init__(self, inst, data=None, key=None, data_size=None, paged=False,
+                 backing_file=None, memory_stats=False, machine=None, issue_width=None):
+        self.machine = MachineDescription.resolve(machine)
+        self.issue_width = issue_width or self.machine.issue_width
+        #Estado Arquitectonico
+        self.registros = RegisterFile()
+        self.safe = Safe()
+        if data_size is None:
+            data_size = MAX_DATA_WORDS if paged else self.machine.data_words
+        self.memory = CentralMemory(data_size, paged, backing_file)
+        if memory_stats:
+            self.memory.enable_stats()
+        self.memory.load_instructions(inst)
+        if data:
+            self.memory.data_mem.load_file(data, start_address=4)
+        if key:
+            self.memory.data_mem.load_key(key, start_address=0)
+        self.instructions = []
+        ScoreboardParser.parse_program(self.memory.inst_mem.program, self)
+
+        self.units = [build_unit(unit_type, latency, self.safe, self.memory, self.registros)
+                      for unit_type, latency in self.machine.units]
+        self.executing = [None] * len(self.units)  # estación en cada unidad
+
+        # Estaciones de reserva por tipo, en orden de índice
+        unit_counts = {}
+        for fu in self.units:
+            unit_counts[fu.type] = unit_counts.get(fu.type, 0) + 1
+        self.stations = []
+        self.stations_by_type = {}
+        for unit_type, count in unit_counts.items():
+            count = self.machine.reservation_stations.get(unit_type, STATIONS_PER_UNIT * count)
+            for _ in range(count):
+                rs = ReservationStation(unit_type, len(self.stations))
+                self.stations.append(rs)
+                self.stations_by_type.setdefault(unit_type, []).append(rs)
+
+        for inst in self.instructions:
+            if inst.op not in self.stations_by_type:
+                raise ValueError(f"La máquina no tiene unidades de tipo {inst.op} para {inst.opname}")
+            inst.latency = self.machine.latency(inst)
+            inst.sources = operand_registers(inst)
+            inst.writes = writes_register(inst)
+
+        self.register_status = [None] * 16  # estación que producirá cada registro
+        self.pc = 0
+        self.clock = 1
+        self.seq = 0
+        self.wait_branch = False
+        self.busy_stations = 0
+        self.stats = {
+            "retired": 0,
+            "issue_stalls": {"structural": 0, "branch": 0},
+            "cdb_conflicts": 0,   # ciclos con más de un resultado esperando el bus
+        }
+
+    """ Releases the data memory (mapped pages and backing file); also used as
+    a context manager"""
+    def close(self):
+        self.memory.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def done(self):
+        return self.pc >= len(self.instructions) and self.busy_stations == 0
+
+    """ Runs the simulation until every instruction has finished"""
+    def run(self):
+        while not self.done():
+            self.tick()
+
+    """ Tick: simulates a clock cycle"""
+    def tick(self):
+        self.dispatch_and_execute()
+        self.issue()
+        self.write_result()
+        self.clock += 1
+
+    """ Dispatch and execute stage: free units take the oldest ready station
+    of their type, busy units run one clock"""
+    def dispatch_and_execute(self):
+        for index, fu in enumerate(self.units):
+            rs = self.executing[index]
+            if rs is None:
+                rs = self.select(fu.type)
+                if rs is None:
+                    continue
+                rs.state = EXECUTING
+                rs.unit = fu
+                inst = rs.inst
+                fu.start(inst.latency)
+                inst.read_ops = self.clock
+                self.executing[index] = rs
+                if fu.type == 'memory':
+                    fu.regs = rs  # STK copia R1-R4 de los operandos de la estación
+
+            inst = rs.inst
+            rs.result = inst.handler(fu, rs.regs)
+            if fu.clocks == 0:
+                rs.state = DONE
+                rs.done_clock = self.clock
+                rs.taken = fu.zero_flag
+                fu.zero_flag = False
+                inst.ex_cmplt = self.clock
+                self.executing[index] = None
+
+    """ Returns the oldest station of a type that can start executing"""
+    def select(self, unit_type):
+        best = None
+        for rs in self.stations_by_type[unit_type]:
+            if rs.ready() and (best is None or rs.seq < best.seq) and not self.blocked(rs):
+                best = rs
+        return best
+
+    """ Determines if an older unfinished instruction shares memory or the
+    Safe with the station's instruction"""
+    def blocked(self, rs):
+        for other in self.stations:
+            if (other.busy and other.seq < rs.seq and other.state != DONE
+                    and conflicts(other.inst, rs.inst)):
+                return True
+        return False
+
+    """ Issue stage: up to issue_width instructions, in order, to free
+    reservation stations, renaming their destination registers"""
+    def issue(self):
+        regs = self.registros.regs
+        for _ in range(self.issue_width):
+            if self.pc >= len(self.instructions):
+                return
+            if self.wait_branch:
+                self.stats["issue_stalls"]["branch"] += 1
+                return
+            inst = self.instructions[self.pc]
+            rs = next((rs for rs in self.stations_by_type[inst.op] if not rs.busy), None)
+            if rs is None:
+                self.stats["issue_stalls"]["structural"] += 1
+                return
+
+            rs.issue(inst, self.pc, self.seq)
+            # Los registros que el handler lee pero la instrucción no usa se
+            # copian igual, sin esperar a nadie
+            rs.regs[:] = regs
+            for reg in inst.sources:
+                producer = self.register_status[reg]
+                if producer is not None:
+                    rs.pending.add(reg)
+                    producer.consumers.append((rs, reg))
+            if inst.writes:
+                self.register_status[inst.fi_idx] = rs
+            if inst.is_branch:
+                self.wait_branch = True
+
+            inst.issue = self.clock
+            self.pc += 1
+            self.seq += 1
+            self.busy_stations += 1
+
+    """ Write result stage: stations without a register result retire, and the
+    oldest finished station with one broadcasts it on the common data bus"""
+    def write_result(self):
+        broadcast = None
+        waiting = 0
+        for rs in self.stations:
+            if not rs.busy or rs.state != DONE or rs.done_clock >= self.clock:
+                continue
+            if rs.inst.writes:
+                waiting += 1
+                if broadcast is None or rs.seq < broadcast.seq:
+                    broadcast = rs
+            else:
+                if rs.inst.is_branch:
+                    if rs.taken:
+                        self.pc = rs.result
+                    self.wait_branch = False
+                self.retire(rs)
+
+        if waiting > 1:
+            self.stats["cdb_conflicts"] += 1
+        if broadcast is not None:
+            inst = broadcast.inst
+            if broadcast.result is not None:
+                value = broadcast.result & 0xFFFFFFFF
+                if self.register_status[inst.fi_idx] is broadcast:
+                    self.registros.regs[inst.fi_idx] = value
+                    self.register_status[inst.fi_idx] = None
+                for consumer, reg in broadcast.consumers:
+                    consumer.capture(reg, value)
+            else:
+                if self.register_status[inst.fi_idx] is broadcast:
+                    self.register_status[inst.fi_idx] = None
+                for consumer, reg in broadcast.consumers:
+                    consumer.capture(reg, self.registros.regs[reg])
+            self.retire(broadcast)
+
+    def retire(self, rs):
+        rs.inst.write_res = self.clock
+        rs.clear()
+        self.busy_stations -= 1
+        self.stats["retired"] += 1
+
+    def to_dict(self):
+        """Estadísticas de la corrida"""
+        cycles = self.clock - 1
+        return {
+            "cycles": cycles,
+            "ipc": self.stats["retired"] / cycles if cycles else 0.0,
+            "stations": len(self.stations),
+            **self.stats,
+        }
@@ -11,16 +11,23 @@ FORMAT_HEADER = \
 
 class FunctionalUnit:
 
+  operations = {}                         # opname -> operation implemented by the FU
+
   def __init__(self, type, clocks):
     self.type = type                      # type of functional unit
     self.clocks = clocks                  # clocks remaining
     self.default_clock = clocks           # max num of clocks for FU
+    self.latency = clocks                 # clocks of the current instruction
     self.busy = False                     # busy status
     self.fi = self.fj = self.fk = None    # instruction registers
     self.qj = self.qk = None              # FUs producing source registers Fj, Fk
     self.rj = self.rk = True              # Flags for Fj, Fk ready status
-    self.lock = False                     # mutex
     self.inst_pc = -1                     # pc for the instruction using the FU
+    self.interlock = ()                   # registers that must be free to execute
+    self.index = -1                       # position in the scoreboard units
+    self.fi_slot = self.fj_slot = self.fk_slot = None  # register status entries
+    self.consumers = []                   # FUs waiting on this FU's result
+    self.operands = None                  # registers copied in read operands, if kept
 
 
   def __str__(self):
@@ -38,12 +45,27 @@ class FunctionalUnit:
 
   """Resets the functional unit so it can be used by another instruction"""
   def clear(self):
-    self.clocks = self.default_clock
+    self.clocks = self.latency = self.default_clock
     self.busy = False
     self.fi = self.fj = self.fk = None
+    self.fi_slot = self.fj_slot = self.fk_slot = None
     self.qj = self.qk = None
     self.rj = self.rk = True
     self.inst_pc = -1
+    self.operands = None
+
+
+  """Loads the execute clocks of an instruction (the unit's default latency
+  if the instruction has none of its own)"""
+  def start(self, latency=None):
+    self.latency = latency if latency is not None else self.default_clock
+    self.clocks = self.latency
+
+
+  """Determines if the clock just run is the first execute clock of the
+  instruction, whatever its latency"""
+  def first_clock(self):
+    return self.clocks == self.latency - 1
 
 
   """Determines if a functional unit has been issued"""
@@ -54,15 +76,24 @@ class FunctionalUnit:
   """Encapsulates the functionality of issuing an instruction"""
   def issue(self, inst, reg_status):
     self.busy = True
+    self.start(inst.latency)
     self.fi = inst.fi
     self.fj = inst.fj
     self.fk = inst.fk
+    self.fi_slot = inst.fi_slot
+    self.fj_slot = inst.fj_slot
+    self.fk_slot = inst.fk_slot
     self.opname = inst.opname
+    self.interlock = inst.interlock
 
-    if inst.fj in reg_status:
-      self.qj = reg_status[inst.fj]
-    if inst.fk in reg_status:
-      self.qk = reg_status[inst.fk]
+    # reg_status is indexed by register status entry (see ParserMarcador)
+    if inst.fj_slot is not None and reg_status[inst.fj_slot] is not None:
+      self.qj = reg_status[inst.fj_slot]
+      self.qj.consumers.append(self)
+    if inst.fk_slot is not None and reg_status[inst.fk_slot] is not None:
+      self.qk = reg_status[inst.fk_slot]
+      if self.qk is not self.qj:
+        self.qk.consumers.append(self)
 
     self.rj = not self.qj
     self.rk = not self.qk
@@ -74,18 +105,45 @@ class FunctionalUnit:
     self.rk = False
 
 
-  """Update function encapsulates the clock on a functional unit"""
-  def execute(self):
+  """Registers the execute clocks take their operands from: the copy made
+  in read operands by units that keep one, or the live register file"""
+  def operand_registers(self, regs):
+    return self.operands if self.operands is not None else regs
+
+
+  """Update function encapsulates the clock on a functional unit and
+  dispatches opcode through the operation table of the unit"""
+  def execute(self, opcode, val1=0, val2=0, val3=0):
+    operation = self.operations.get(opcode)
+    if operation is None:
+      self.clocks -= 1
+      return 0, f"Opcode no soportado: {opcode}"
+    return self.run(operation, val1, val2, val3)
+
+
+  """Runs an already resolved operation for one clock. Used by the handlers
+  bound to each instruction during predecode"""
+  def run(self, operation, val1, val2=0, val3=0):
     self.clocks -= 1
+    try:
+      return operation(self, val1, val2, val3)
+    except Exception as e:
+      return 0, f"Error de ejecución: {str(e)}"
 
 
   """Encapsulates the functionality of writing back an instruction
-  Requires as input all of the functional units on the scoreboard"""
-  def write_back(self, f_units):
-    for f in f_units:
-      if f.qj == self:
+  Wakes up the FUs waiting on this result; readers counts, per register
+  status entry, the operands that are ready but not read yet"""
+  def write_back(self, readers):
+    for f in self.consumers:
+      if f.qj is self:
         f.rj = True
         f.qj = None
-      if f.qk == self:
+        if f.fj_slot is not None:
+          readers[f.fj_slot] += 1
+      if f.qk is self:
         f.rk = True
         f.qk = None
+        if f.fk_slot is not None:
+          readers[f.fk_slot] += 1
+    self.consumers = []
@@ -1,16 +1,44 @@
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QTextEdit, QTabWidget, QFileDialog, QMessageBox,
     QMenuBar, QTableWidget, QTableWidgetItem, QSplitter, QWidget, QVBoxLayout,
-    QHeaderView, QLabel, QHBoxLayout, QPushButton, QToolBar, QComboBox
+    QHeaderView, QLabel, QHBoxLayout, QPushButton, QToolBar, QComboBox, QTableView
 )
-from PySide6.QtCore import (Qt,QRegularExpression)
+from PySide6.QtCore import (Qt,QRegularExpression,QAbstractTableModel,QModelIndex,
+                            QThread,Signal)
 from PySide6.QtGui import (QAction, QTextCharFormat, QFont, QSyntaxHighlighter, 
-                          QColor, QTextDocument)
+                          QColor, QTextDocument, QTextCursor)
 import sys
 import os
-from math import ceil
+import time
+import threading
+from collections import namedtuple
+from math import ceil, log1p
 from Pipeline import Pipeline_marcador
-from traductor import ensamblar
+from Checkpoint import CHECKPOINT_INTERVAL
+from Ensamblador import IncrementalAssembler
+
+# Palabras de memoria de datos que se muestran en el panel de memoria
+MEMORY_ROWS = 15360
+
+# Actualizaciones por segundo de la interfaz mientras corre una simulación
+SNAPSHOT_HZ = 30
+
+# Líneas con error de codificación que se subrayan en el editor
+MAX_ERROR_MARKS = 200
+
+# Estado visible de una simulación, inmutable para pasarlo entre hilos
+SimulationSnapshot = namedtuple('SimulationSnapshot', ['clock', 'registers', 'safe', 'memory', 'heat'])
+
+def take_snapshot(sb):
+    """Copia registros, Safe, memoria y, si se registran, los accesos por palabra"""
+    stats = sb.memory.stats
+    return SimulationSnapshot(
+        sb.clock,
+        tuple(sb.registros.regs),
+        tuple(tuple(tuple(half) for half in key) for key in sb.safe.keys),
+        sb.memory.export_data(0, MEMORY_ROWS),
+        stats.word_counts(0, MEMORY_ROWS) if stats is not None else None,
+    )
 
 class SyntaxHighlighter(QSyntaxHighlighter):
     def __init__(self, parent=None):
@@ -68,6 +96,150 @@ class SyntaxHighlighter(QSyntaxHighlighter):
                              match.capturedLength(), 
                              format)
 
+class MemoryTableModel(QAbstractTableModel):
+    """Modelo del panel de memoria. Guarda la última imagen de memoria en bytes,
+    formatea solo las filas que la vista pide y avisa con dataChanged solo las
+    palabras que cambiaron desde la última actualización"""
+
+    # Bytes que se comparan de una vez antes de buscar palabra por palabra
+    BLOCK_BYTES = 1024
+
+    def __init__(self, rows, format_value, parent=None):
+        super().__init__(parent)
+        self.rows = rows
+        self.format_value = format_value
+        self.snapshot = bytes(4 * rows)
+        self.heat = None          # accesos por palabra para el mapa de calor
+        self.heat_max = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 2
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return ["Address", "Value"][section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.BackgroundRole and self.heat is not None and index.isValid():
+            return self.heat_color(self.heat[index.row()])
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        row = index.row()
+        if index.column() == 0:
+            return f"{row:04X}"  # Mostrar dirección en hexadecimal
+        offset = 4 * row
+        return self.format_value(int.from_bytes(self.snapshot[offset:offset + 4], 'little'))
+
+    def update_snapshot(self, snapshot):
+        """Recibe la memoria como bytes little-endian y avisa los rangos de filas que cambiaron"""
+        old = self.snapshot
+        self.snapshot = snapshot
+        if old == snapshot:
+            return
+
+        first = last = None
+        for start in range(0, len(snapshot), self.BLOCK_BYTES):
+            end = start + self.BLOCK_BYTES
+            if old[start:end] == snapshot[start:end]:
+                continue
+            for offset in range(start, min(end, len(snapshot)), 4):
+                if old[offset:offset + 4] == snapshot[offset:offset + 4]:
+                    continue
+                row = offset // 4
+                if last is not None and row == last + 1:
+                    last = row
+                    continue
+                if first is not None:
+                    self.dataChanged.emit(self.index(first, 1), self.index(last, 1))
+                first = last = row
+        if first is not None:
+            self.dataChanged.emit(self.index(first, 1), self.index(last, 1))
+
+    def heat_color(self, count):
+        """Blanco sin accesos hasta rojo en la palabra más usada (escala logarítmica)"""
+        if count == 0:
+            return None
+        level = int(200 * log1p(count) / log1p(self.heat_max))
+        return QColor(255, 255 - level, 255 - level)
+
+    def update_heat(self, heat):
+        """Recibe los accesos por palabra (None quita el mapa de calor)"""
+        if heat is None and self.heat is None:
+            return
+        self.heat = heat
+        self.heat_max = max(heat) if heat else 0
+        self.dataChanged.emit(self.index(0, 0), self.index(self.rows - 1, 1), [Qt.BackgroundRole])
+
+    def refresh_format(self):
+        """Vuelve a formatear los valores (solo se recalculan las filas visibles)"""
+        self.dataChanged.emit(self.index(0, 1), self.index(self.rows - 1, 1))
+
+class SimulationWorker(QThread):
+    """Corre la simulación a máxima velocidad fuera del hilo de la interfaz y
+    publica copias de su estado a lo sumo snapshot_hz veces por segundo"""
+
+    snapshot_ready = Signal(object)
+    run_finished = Signal(bool)  # True si terminó, False si se canceló
+    run_failed = Signal(str)
+
+    # Ciclos entre revisiones de pausa, cancelación y reloj
+    CHECK_TICKS = 256
+
+    def __init__(self, sb, snapshot_hz=SNAPSHOT_HZ, publish=True, parent=None):
+        super().__init__(parent)
+        self.sb = sb
+        self.snapshot_period = 1.0 / snapshot_hz
+        self.publish = publish  # sin publicar solo se envía el estado final
+        self._running = threading.Event()
+        self._running.set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def is_paused(self):
+        return not self._running.is_set()
+
+    def cancel(self):
+        self.requestInterruption()
+        self._running.set()
+
+    def run(self):
+        sb = self.sb
+        next_snapshot = time.monotonic()
+        try:
+            while not sb.done():
+                for _ in range(self.CHECK_TICKS):
+                    if sb.done():
+                        break
+                    sb.tick()
+
+                if not self._running.is_set():
+                    # Mostrar dónde quedó la simulación mientras está en pausa
+                    self.snapshot_ready.emit(take_snapshot(sb))
+                    self._running.wait()
+                if self.isInterruptionRequested():
+                    self.snapshot_ready.emit(take_snapshot(sb))
+                    self.run_finished.emit(False)
+                    return
+
+                now = time.monotonic()
+                if self.publish and now >= next_snapshot:
+                    self.snapshot_ready.emit(take_snapshot(sb))
+                    next_snapshot = now + self.snapshot_period
+        except Exception as e:
+            self.run_failed.emit(str(e))
+            return
+
+        self.snapshot_ready.emit(take_snapshot(sb))
+        self.run_finished.emit(True)
+
 class SimpleTextEditor(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -76,8 +248,13 @@ class SimpleTextEditor(QMainWindow):
 
         self.display_format = 'hex'
         self.interface_connected = True  # Estado inicial: conectado
+        self.snapshot_hz = SNAPSHOT_HZ
+        self.heatmap_enabled = False     # registrar accesos a memoria y mostrarlos
+        self.worker = None               # simulación corriendo en segundo plano
+        self.last_snapshot = None
 
         self.open_tabs = {}
+        self.assemblers = {}             # editor -> IncrementalAssembler
         self.untitled_count = 1
 
         self._create_menu()
@@ -118,11 +295,21 @@ class SimpleTextEditor(QMainWindow):
             value_item = self.register_table.item(i, 1)
             value_item.setText(self.format_value(safe_values[i]))
 
-    def update_memory_table(self, memory_values):
-        """Actualiza la tabla de memoria con los valores del pipeline"""
-        for i, value in enumerate(memory_values):
-            val_item = self.memory_table.item(i, 1)
-            val_item.setText(self.format_value(value))
+    def update_memory_table(self, memory_bytes):
+        """Actualiza la tabla de memoria con la imagen de memoria del pipeline (None la pone en cero)"""
+        if memory_bytes is None:
+            memory_bytes = bytes(4 * MEMORY_ROWS)
+        self.memory_model.update_snapshot(memory_bytes)
+
+    def show_snapshot(self, snapshot):
+        """Muestra en las tablas el estado copiado de una simulación"""
+        self.last_snapshot = snapshot
+        if not self.interface_connected:
+            return
+        self.update_register_table(snapshot.registers)
+        self.update_safe_table(snapshot.safe)
+        self.update_memory_table(snapshot.memory)
+        self.memory_model.update_heat(snapshot.heat if self.heatmap_enabled else None)
 
     def load_data_file(self):
         """Permite al usuario seleccionar un archivo de datos para cargar en memoria"""
@@ -188,12 +375,33 @@ class SimpleTextEditor(QMainWindow):
         step_action = QAction("Step", self)
         step_action.triggered.connect(self.step_code)
         self.toolbar.addAction(step_action)
+
+        # Botón Back
+        back_action = QAction("Back", self)
+        back_action.triggered.connect(self.step_back)
+        self.toolbar.addAction(back_action)
+        
+        # Botón Pause
+        self.pause_action = QAction("Pause", self)
+        self.pause_action.triggered.connect(self.toggle_pause)
+        self.toolbar.addAction(self.pause_action)
+
+        # Botón Stop
+        stop_action = QAction("Stop", self)
+        stop_action.triggered.connect(self.stop_simulation)
+        self.toolbar.addAction(stop_action)
         
         # Botón Reset
         reset_action = QAction("Reset", self)
         reset_action.triggered.connect(self.reset_simulation)
         self.toolbar.addAction(reset_action)
 
+        # Botón Heatmap
+        self.heatmap_action = QAction("Heatmap", self)
+        self.heatmap_action.setCheckable(True)
+        self.heatmap_action.toggled.connect(self.toggle_heatmap)
+        self.toolbar.addAction(self.heatmap_action)
+
         # Botón Toggle Interface
         self.toggle_interface_action = QAction("Desconectar", self)
         self.toggle_interface_action.triggered.connect(self.toggle_interface)
@@ -211,6 +419,7 @@ class SimpleTextEditor(QMainWindow):
         self.editor_tabs = QTabWidget()
         self.editor_tabs.setTabsClosable(True)
         self.editor_tabs.tabCloseRequested.connect(self.close_tab)
+        self.editor_tabs.currentChanged.connect(lambda index: self.show_assembly_errors())
         self.new_tab()
 
         # --- Panel central: Registers + Safe ---
@@ -253,20 +462,15 @@ class SimpleTextEditor(QMainWindow):
         right_panel.setLayout(right_layout)
 
         memory_label = QLabel("Memory")
-        self.memory_table = QTableWidget(15360, 2)  # Mostrar todas las 4096 posiciones
-        self.memory_table.setHorizontalHeaderLabels(["Address", "Value"])
+        self.memory_model = MemoryTableModel(MEMORY_ROWS, self.format_value, self)
+        self.memory_table = QTableView()
+        self.memory_table.setModel(self.memory_model)
         self.memory_table.horizontalHeader().setStretchLastSection(True)
         self.memory_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.memory_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
         
         # Configurar scroll para mejorar rendimiento con tantas filas
-        self.memory_table.setVerticalScrollMode(QTableWidget.ScrollPerPixel)
-        
-        for i in range(15360):
-            addr_item = QTableWidgetItem(f"{i:04X}")  # Mostrar dirección en hexadecimal
-            addr_item.setFlags(Qt.ItemIsEnabled)
-            val_item = QTableWidgetItem("0")
-            self.memory_table.setItem(i, 0, addr_item)
-            self.memory_table.setItem(i, 1, val_item)
+        self.memory_table.setVerticalScrollMode(QTableView.ScrollPerPixel)
 
         right_layout.addWidget(memory_label)
         right_layout.addWidget(self.memory_table)
@@ -293,11 +497,10 @@ class SimpleTextEditor(QMainWindow):
         }
         self.display_format = format_map.get(format_text, "hex")
         # Actualizamos las tablas para reflejar el nuevo formato
-        if hasattr(self, 'sb'):
-            self.update_register_table(self.sb.registros.regs)
-            self.update_safe_table(self.sb.safe.keys)
-            memory_values = [self.sb.memory.data_mem.read(i) for i in range(15360)]
-            self.update_memory_table(memory_values)
+        if self.last_snapshot is not None:
+            self.update_register_table(self.last_snapshot.registers)
+            self.update_safe_table(self.last_snapshot.safe)
+        self.memory_model.refresh_format()
 
     def format_value(self, value):
         """Formatea un valor según el formato seleccionado"""
@@ -316,17 +519,71 @@ class SimpleTextEditor(QMainWindow):
         editor = QTextEdit()
         tab_name = f"untitled {self.untitled_count}"
         self.untitled_count += 1
+        self.attach_assembler(editor)
         self.editor_tabs.addTab(editor, tab_name)
         self.editor_tabs.setCurrentWidget(editor)
 
         SyntaxHighlighter(editor.document())
 
+    def attach_assembler(self, editor, path=None):
+        """Ensamblador incremental de la pestaña, al día con cada cambio del texto"""
+        self.assemblers[editor] = IncrementalAssembler(editor.toPlainText(), path)
+        editor.document().contentsChange.connect(
+            lambda position, removed, added: self.reassemble(editor, position, added))
+
+    def reassemble(self, editor, position, added):
+        """Vuelve a codificar las líneas que tocó un cambio del documento"""
+        assembler = self.assemblers.get(editor)
+        if assembler is None:
+            return
+        document = editor.document()
+        first = document.findBlock(position).blockNumber()
+        end = min(position + added, document.characterCount() - 1)
+        last = document.findBlock(end).blockNumber()
+        # Líneas que había en el rango: las que quedaron menos las agregadas
+        removed = (last - first + 1) - (document.blockCount() - assembler.line_count())
+        if first < 0 or last < first or removed < 0 or first + removed > assembler.line_count():
+            assembler.set_text(editor.toPlainText())
+        else:
+            assembler.update(first, removed, [document.findBlockByNumber(i).text()
+                                              for i in range(first, last + 1)])
+        self.show_assembly_errors(editor)
+
+    def show_assembly_errors(self, editor=None):
+        """Subraya las líneas que no se pueden codificar y muestra la primera"""
+        editor = editor or self.editor_tabs.currentWidget()
+        assembler = self.assemblers.get(editor)
+        if assembler is None:
+            return
+        errors = assembler.line_errors()
+
+        error_format = QTextCharFormat()
+        error_format.setUnderlineStyle(QTextCharFormat.WaveUnderline)
+        error_format.setUnderlineColor(QColor(220, 0, 0))
+        selections = []
+        for line, _ in errors[:MAX_ERROR_MARKS]:
+            cursor = QTextCursor(editor.document().findBlockByNumber(line))
+            cursor.movePosition(QTextCursor.EndOfBlock, QTextCursor.KeepAnchor)
+            selection = QTextEdit.ExtraSelection()
+            selection.cursor = cursor
+            selection.format = error_format
+            selections.append(selection)
+        editor.setExtraSelections(selections)
+
+        if editor is self.editor_tabs.currentWidget():
+            if errors:
+                line, message = errors[0]
+                self.statusBar().showMessage(f"Línea {line + 1}: {message}")
+            else:
+                self.statusBar().clearMessage()
+
     def close_tab(self, index):
         editor = self.editor_tabs.widget(index)
         for path, ed in list(self.open_tabs.items()):
             if ed == editor:
                 del self.open_tabs[path]
                 break
+        self.assemblers.pop(editor, None)
         self.editor_tabs.removeTab(index)
 
     def open_file(self):
@@ -342,6 +599,7 @@ class SimpleTextEditor(QMainWindow):
                     content = f.read()
                     editor = QTextEdit()
                     editor.setPlainText(content)
+                    self.attach_assembler(editor, path)
                     self.editor_tabs.addTab(editor, os.path.basename(path))
                     self.editor_tabs.setCurrentWidget(editor)
                     self.open_tabs[path] = editor
@@ -371,6 +629,7 @@ class SimpleTextEditor(QMainWindow):
                 with open(path, 'w', encoding='utf-8') as f:
                     f.write(editor.toPlainText())
                     self.open_tabs[path] = editor
+                    self.assemblers[editor].name = path
                     self.editor_tabs.setTabText(self.editor_tabs.indexOf(editor), os.path.basename(path))
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Could not save file:\n{e}")
@@ -383,18 +642,8 @@ class SimpleTextEditor(QMainWindow):
             original_size = os.path.getsize(original_path)
             total_bytes = ceil(original_size / 8) * 8  # padding a múltiplo de 8
 
-            encrypted_data = bytearray()
-
-            for i in range(0, total_bytes, 8):
-                # Leer dos palabras de 32 bits (4 bytes cada una)
-                word1 = sb.memory.data_mem.read((i // 4) + 4, True)
-                word2 = sb.memory.data_mem.read((i // 4) + 5, True)
-
-                # Convertir a bytes en little-endian
-                word_bytes1 = word1.to_bytes(4, byteorder='little')
-                word_bytes2 = word2.to_bytes(4, byteorder='little')
-
-                encrypted_data.extend(word_bytes1 + word_bytes2)
+            # Palabras de 32 bits desde la dirección 4, en little-endian
+            encrypted_data = sb.memory.export_data(4, total_bytes // 4)
 
             with open(enc_path, 'wb') as f:
                 f.write(encrypted_data)
@@ -435,48 +684,86 @@ class SimpleTextEditor(QMainWindow):
                 QMessageBox.warning(self, "Error", "Debe guardar el archivo primero.")
                 return
         
+        if self.worker is not None:
+            QMessageBox.warning(self, "Error", "Ya hay una simulación en ejecución.")
+            return
+        
         try:
-            ensamblar(current_path, "Proyecto_arqui/procesador/salida.txt")
+            # El programa ya está ensamblado: el ensamblador de la pestaña
+            # sigue cada cambio del texto
+            programa = self.assemblers[editor].program()
 
             # Usamos el archivo de datos si se ha seleccionado uno, sino None
             data_file = getattr(self, 'data_file_path', None)
             key_file = getattr(self, 'key_file_path', None)
             
-            sb = Pipeline_marcador("salida.txt", data_file, key_file)
-
-            # Ejecutamos todas las instrucciones
-            while not sb.done():
-                sb.tick()
-                
-                # Solo actualizamos la interfaz si está conectada
-                if self.interface_connected:
-                    # Actualizamos la interfaz después de cada ciclo
-                    self.update_register_table(sb.registros.regs)
-                    self.update_safe_table(sb.safe.keys)
-                    
-                    # Actualizamos la memoria (primeras 10 posiciones)
-                    memory_values = [int(sb.memory.data_mem.read(i, True)) for i in range(15360)]
-                    self.update_memory_table(memory_values)
-                    
-                    # Forzamos la actualización de la interfaz
-                    QApplication.processEvents()
-
-            QMessageBox.information(self, "Éxito", "Ejecución completada")
-
-            if hasattr(self, 'data_file_path'):
-                reply = QMessageBox.question(
-                    self, 
-                    'Guardar encriptado',
-                    "¿Desea guardar el archivo encriptado?",
-                    QMessageBox.Yes | QMessageBox.No
-                )
-                if reply == QMessageBox.Yes:
-                    self.save_encrypted_file(sb, data_file)
-            
+            sb = Pipeline_marcador(programa, data_file, key_file, event_driven=True,
+                                   memory_stats=self.heatmap_enabled,
+                                   checkpoint_interval=CHECKPOINT_INTERVAL)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Ocurrió un error:\n{e}")
+            return
+
+        # Ejecutamos todas las instrucciones en segundo plano; la interfaz
+        # recibe el estado a lo sumo snapshot_hz veces por segundo
+        self.worker = SimulationWorker(sb, self.snapshot_hz, self.interface_connected, self)
+        self.worker.snapshot_ready.connect(self.show_snapshot)
+        self.worker.run_finished.connect(self._run_finished)
+        self.worker.run_failed.connect(self._run_failed)
+        self.worker.start()
+
+    def _end_worker(self):
+        worker = self.worker
+        self.worker = None
+        worker.wait()
+        self.pause_action.setText("Pause")
+        return worker.sb
+
+    def _run_finished(self, completed):
+        # La simulación queda disponible para Step y Back
+        sb = self.sb = self._end_worker()
+        if not completed:
+            QMessageBox.information(self, "Detenido", f"Simulación detenida en el ciclo {sb.clock}")
+            return
+
+        QMessageBox.information(self, "Éxito", "Ejecución completada")
+
+        data_file = getattr(self, 'data_file_path', None)
+        if data_file:
+            reply = QMessageBox.question(
+                self, 
+                'Guardar encriptado',
+                "¿Desea guardar el archivo encriptado?",
+                QMessageBox.Yes | QMessageBox.No
+            )
+            if reply == QMessageBox.Yes:
+                self.save_encrypted_file(sb, data_file)
+
+    def _run_failed(self, message):
+        self._end_worker()
+        QMessageBox.critical(self, "Error", f"Ocurrió un error:\n{message}")
+
+    def toggle_pause(self):
+        """Pausa o reanuda la simulación en segundo plano"""
+        if self.worker is None:
+            return
+        if self.worker.is_paused():
+            self.worker.resume()
+            self.pause_action.setText("Pause")
+        else:
+            self.worker.pause()
+            self.pause_action.setText("Resume")
+
+    def stop_simulation(self):
+        """Cancela la simulación en segundo plano"""
+        if self.worker is not None:
+            self.worker.cancel()
 
     def step_code(self):
+        if self.worker is not None:
+            QMessageBox.warning(self, "Error", "Hay una simulación en ejecución.")
+            return
+
         if not hasattr(self, 'sb') or self.sb.done():
             # Si no hay simulación o ya terminó, comenzar una nueva
             editor = self.editor_tabs.currentWidget()
@@ -495,11 +782,13 @@ class SimpleTextEditor(QMainWindow):
                 return
             
             try:
-                ensamblar(current_path, "Proyecto_arqui/procesador/salida.txt")
+                programa = self.assemblers[editor].program()
                 data_file = getattr(self, 'data_file_path', None)
                 key_file = getattr(self, 'key_file_path', None)
 
-                self.sb = Pipeline_marcador("salida.txt", data_file, key_file)
+                self.sb = Pipeline_marcador(programa, data_file, key_file,
+                                            memory_stats=self.heatmap_enabled,
+                                            checkpoint_interval=CHECKPOINT_INTERVAL)
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Ocurrió un error:\n{e}")
                 return
@@ -509,32 +798,59 @@ class SimpleTextEditor(QMainWindow):
             self.sb.tick()
             
             # Solo actualizamos la interfaz si está conectada
-            if self.interface_connected:
-                self.update_register_table(self.sb.registros.regs)
-                self.update_safe_table(self.sb.safe.keys)
-                    
-                # Actualizamos la memoria (primeras 10 posiciones)
-                memory_values = [int(self.sb.memory.data_mem.read(i, True)) for i in range(15360)]
-                self.update_memory_table(memory_values)
+            self.show_snapshot(take_snapshot(self.sb))
         
             
             if self.sb.done():
                 QMessageBox.information(self, "Fin", "Ejecución completada")
 
+    def step_back(self):
+        """Retrocede un ciclo desde el checkpoint anterior más cercano"""
+        if self.worker is not None:
+            QMessageBox.warning(self, "Error", "Hay una simulación en ejecución.")
+            return
+        if not hasattr(self, 'sb') or self.sb.clock <= 1:
+            return
+
+        try:
+            self.sb.step_back(1)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Ocurrió un error:\n{e}")
+            return
+        self.show_snapshot(take_snapshot(self.sb))
+
     def reset_simulation(self):
+        if self.worker is not None:
+            self.worker.run_finished.disconnect(self._run_finished)
+            self.worker.run_failed.disconnect(self._run_failed)
+            self.worker.snapshot_ready.disconnect(self.show_snapshot)
+            self.worker.cancel()
+            self._end_worker()
         if hasattr(self, 'sb'):
             del self.sb
+        self.last_snapshot = None
         
         # Resetear las tablas a cero
         self.update_register_table([0]*16)
         self.update_safe_table([0]*4)
-        self.update_memory_table([0]*10)
+        self.update_memory_table(None)
+        self.memory_model.update_heat(None)
         
         QMessageBox.information(self, "Reset", "Simulación reiniciada")
 
+    def toggle_heatmap(self, enabled):
+        """Activa el registro de accesos a memoria para las próximas simulaciones"""
+        self.heatmap_enabled = enabled
+        if not enabled:
+            self.memory_model.update_heat(None)
+        elif self.last_snapshot is not None:
+            self.memory_model.update_heat(self.last_snapshot.heat)
+
     def toggle_interface(self):
         """Alterna entre conectar y desconectar la interfaz"""
         self.interface_connected = not self.interface_connected
+        if self.worker is not None:
+            self.worker.publish = self.interface_connected
         
         if self.interface_connected:
             self.toggle_interface_action.setText("Desconectar")
@@ -543,6 +859,12 @@ class SimpleTextEditor(QMainWindow):
             self.toggle_interface_action.setText("Conectar")
             QMessageBox.information(self, "Interfaz", "Interfaz desconectada")
 
+    def closeEvent(self, event):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker.wait()
+        super().closeEvent(event)
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del simulador se importan por nombre desde procesador/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,61 @@
+import random
+import pytest
+
+from Ensamblador import IncrementalAssembler
+from traductor import ensamblar_fuente
+
+# Líneas para las ediciones al azar: instrucciones válidas, etiquetas, saltos
+# a etiquetas que se mueven, aparecen y desaparecen, y líneas con errores
+LINES = [
+    "", "   ", "a:", "b:", "c:", "a: ", "b :",
+    "ADD R1, R2, 3", "SUB R3, R1, R2", "MUL R4, R4, 2", "XOR R5, R5, R1",
+    "LOAD R6, R0, R1", "STOR R6, R0, R1", "STK R1", "SAXS R7, R1, R2", "DLT R1",
+    "LOOP R1, a", "LOOP R2, b", "LOOP R3, c", "LOOP R1, 3", "LOOP R1,a",
+    ",", ", ,", "LOOP", "LOOP R1", "LOOP R1, x", "ADD R1, R2, 300", "ADD R1, R2, -1",
+    "ADD R0, R1, 1", "ADD R1, R16, 1", "FOO R1, R2, R3", "ADD R1, R2",
+]
+
+def reference(text):
+    """Programa de ensamblar_fuente, o None si la fuente tiene errores"""
+    try:
+        return ensamblar_fuente(text).lines
+    except (KeyError, IndexError, ValueError):
+        return None
+
+def check(assembler, source):
+    expected = reference("\n".join(source))
+    assert assembler.line_count() == len(source)
+    if expected is None:
+        assert assembler.line_errors()
+        with pytest.raises(ValueError):
+            assembler.program()
+    else:
+        assert assembler.line_errors() == []
+        assert assembler.program().lines == expected
+
+def test_crash_on_comma_line():
+    source = ["ADD R1, R2, 3", ",", "b:", "LOOP R1, b"]
+    assembler = IncrementalAssembler("\n".join(source))
+    assembler.update(0, 0, ["ADD R2, R2, 1"])
+    source[0:0] = ["ADD R2, R2, 1"]
+    check(assembler, source)
+    assembler.update(2, 1, [])
+    del source[2]
+    check(assembler, source)
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_edits(seed):
+    rng = random.Random(seed)
+    # Como en el editor, el texto siempre tiene al menos una línea
+    source = [rng.choice(LINES) for _ in range(1 + rng.randrange(10))]
+    assembler = IncrementalAssembler("\n".join(source))
+    check(assembler, source)
+    for _ in range(150):
+        first = rng.randrange(len(source) + 1)
+        removed = rng.randrange(min(3, len(source) - first) + 1)
+        lines = [rng.choice(LINES) for _ in range(rng.randrange(4))]
+        if removed == len(source) and not lines:
+            lines = [""]
+        assembler.update(first, removed, lines)
+        source[first:first + removed] = lines
+        check(assembler, source)
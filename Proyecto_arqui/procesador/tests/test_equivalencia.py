@@ -0,0 +1,100 @@
+import os
+import sys
+import pytest
+
+PROCESADOR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROCESADOR)
+
+from Pipeline import Pipeline_marcador, memory_digest
+from Tomasulo import Pipeline_tomasulo
+from Benchmark import KERNELS, PROGRAMS, DATA_BYTES
+from traductor import ensamblar, ensamblar_fuente
+from Machine import MachineDescription
+from Sweep import apply_parameters
+
+# Prueba diferencial: los programas del proyecto y los kernels de Benchmark
+# deben terminar con los mismos ciclos, memoria y registros que el simulador
+# original (commit base), en la máquina por defecto con emisión simple. Los
+# valores se tomaron del simulador original; si un cambio los modifica a
+# propósito, hay que explicarlo en el commit que actualiza esta tabla
+# (raw_chain: las unidades ya no ejecutan mientras esperan a sus productores).
+#
+# caso: (ciclos, instrucciones en modo funcional, SHA-256 de la memoria,
+#        registros finales)
+EXPECTED = {
+    "encriptar": (70026, 22963, "de75225f45b2768642abaa62da0f24e0d961a6da8010dcdda65ea849095db015",
+        [0, 3735928559, 3735928559, 3735928559, 3735928559, 0, 0, 3337565984, 0, 4050572697, 1722162589, 2546518020, 0, 105, 0, 1]),
+    "desencriptar": (70376, 24713, "a0970a723e71d975730bde3e91919a3061fce3cef69f1389b88a6e9e00a8dd8a",
+        [0, 3735928559, 3735928559, 3735928559, 3735928559, 2654435769, 4109355847, 0, 2874234548, 105, 0, 0, 1606327795, 0, 1, 0]),
+    "raw_chain": (5401, 1801, "0693f6bfa2117a9b14f9ceca13d3a5611de5dca226bf999f20a7f615fbd08dff",
+        [0, 3072, 2048, 3072, 6144, 3072, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]),
+    "waw_war": (6801, 2401, "0693f6bfa2117a9b14f9ceca13d3a5611de5dca226bf999f20a7f615fbd08dff",
+        [0, 0, 0, 0, 0, 0, 0, 0, 5, 7, 11, 22, 15, 0, 0, 0]),
+    "structural": (5404, 1802, "0693f6bfa2117a9b14f9ceca13d3a5611de5dca226bf999f20a7f615fbd08dff",
+        [0, 0, 3, 48, 9, 48, 15, 144, 45, 0, 0, 0, 0, 0, 0, 0]),
+    "memory": (5204, 1802, "8e13ac35edfe4a8c999be7023d3ea52d480b352a0434f7e13ea23b667e140cc2",
+        [0, 0, 0, 0, 0, 208, 1, 2, 0, 0, 0, 0, 0, 0, 0, 0]),
+    "branch": (3003, 1001, "0693f6bfa2117a9b14f9ceca13d3a5611de5dca226bf999f20a7f615fbd08dff",
+        [0, 250, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]),
+}
+
+@pytest.fixture(scope="module")
+def data_file(tmp_path_factory):
+    """Los mismos DATA_BYTES bytes de entrada que genera Benchmark"""
+    data = tmp_path_factory.mktemp("datos") / "datos.txt"
+    data.write_bytes(bytes(range(256)) * (DATA_BYTES // 256) + bytes(range(DATA_BYTES % 256)))
+    return str(data)
+
+def case(name, data_file):
+    """(programa, datos, llave) de un caso, como en Benchmark.run_suite"""
+    if name in PROGRAMS:
+        return ensamblar(os.path.join(PROCESADOR, PROGRAMS[name])), data_file, "key.txt"
+    return ensamblar_fuente(KERNELS[name].strip() + "\n", name), None, None
+
+def final_state(sb):
+    return sb.clock - 1, memory_digest(sb.memory), list(sb.registros.regs)
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_timed(name, data_file):
+    with Pipeline_marcador(*case(name, data_file), issue_width=1) as sb:
+        while not sb.done():
+            sb.tick()
+        state = final_state(sb)
+    cycles, _, digest, registers = EXPECTED[name]
+    assert state == (cycles, digest, registers)
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_event_driven(name, data_file):
+    with Pipeline_marcador(*case(name, data_file), event_driven=True, issue_width=1) as sb:
+        sb.run()
+        state = final_state(sb)
+    cycles, _, digest, registers = EXPECTED[name]
+    assert state == (cycles, digest, registers)
+
+@pytest.mark.parametrize("name", EXPECTED)
+def test_functional(name, data_file):
+    with Pipeline_marcador(*case(name, data_file), functional=True) as sb:
+        sb.run()
+        state = final_state(sb)
+    _, instructions, digest, registers = EXPECTED[name]
+    assert state == (instructions, digest, registers)
+
+@pytest.mark.parametrize("issue_width", (1, 2))
+@pytest.mark.parametrize("name", EXPECTED)
+def test_tomasulo(name, issue_width, data_file):
+    """El motor de Tomasulo deja la misma memoria que el modo funcional"""
+    with Pipeline_tomasulo(*case(name, data_file), issue_width=issue_width) as sb:
+        sb.run()
+        digest = memory_digest(sb.memory)
+    assert digest == EXPECTED[name][2]
+
+@pytest.mark.parametrize("latency", range(1, 6))
+@pytest.mark.parametrize("name", PROGRAMS)
+def test_memory_latency(name, latency, data_file):
+    """El cifrado no depende de la latencia de las unidades de memoria"""
+    machine = apply_parameters(MachineDescription.default().to_dict(),
+                               {"units.memory.latency": latency})
+    with Pipeline_marcador(*case(name, data_file), machine=machine) as sb:
+        sb.run()
+        digest = memory_digest(sb.memory)
+    assert digest == EXPECTED[name][2]
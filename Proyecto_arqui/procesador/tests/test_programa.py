@@ -0,0 +1,58 @@
+import os
+
+from Programa import Program
+from traductor import ensamblar, ensamblar_fuente, cache_programas, PROGRAMAS_EN_CACHE
+
+PROCESADOR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_save_load(tmp_path):
+    programa = ensamblar(os.path.join(PROCESADOR, "Encriptación.txt"))
+    ruta = str(tmp_path / "encriptar.sbo")
+    programa.save(ruta)
+    cargado = Program.load(ruta)
+    assert Program.is_packed(ruta)
+    assert cargado.words == programa.words
+    assert cargado.source_hash == programa.source_hash
+    assert cargado.lines == programa.lines
+
+def test_directorio_cache(tmp_path):
+    fuente = "ADD R1, R0, 5\nb:\nSUB R1, R1, 1\nLOOP R1, b\n"
+    cache_programas.clear()
+    programa = ensamblar_fuente(fuente, directorio_cache=str(tmp_path))
+    archivos = os.listdir(tmp_path)
+    assert archivos == [programa.source_hash.hex() + ".sbo"]
+
+    # Otro proceso: sin la caché en memoria, el programa sale del archivo
+    cache_programas.clear()
+    reusado = ensamblar_fuente(fuente, directorio_cache=str(tmp_path))
+    assert reusado is not programa
+    assert reusado.words == programa.words
+
+def test_directorio_cache_hash_distinto(tmp_path):
+    fuente = "ADD R1, R0, 5\nADD R2, R1, 1\n"
+    otra = ensamblar_fuente("ADD R3, R0, 7\n")
+    cache_programas.clear()
+    esperado = ensamblar_fuente(fuente)
+
+    # Un archivo con el nombre de la fuente pero el hash de otra se descarta
+    ruta = tmp_path / (esperado.source_hash.hex() + ".sbo")
+    otra.save(str(ruta))
+    cache_programas.clear()
+    programa = ensamblar_fuente(fuente, directorio_cache=str(tmp_path))
+    assert programa.words == esperado.words
+    assert programa.source_hash == esperado.source_hash
+    # y se reemplaza por el programa correcto
+    assert Program.load(str(ruta)).words == esperado.words
+
+def test_cache_acotada():
+    cache_programas.clear()
+    primero = ensamblar_fuente("ADD R1, R0, 0\n")
+    segundo = ensamblar_fuente("ADD R1, R0, 1\n")
+    for i in range(2, PROGRAMAS_EN_CACHE):
+        ensamblar_fuente(f"ADD R1, R0, {i}\n")
+    # Usar el primero lo vuelve el más reciente: sale el segundo
+    assert ensamblar_fuente("ADD R1, R0, 0\n") is primero
+    ensamblar_fuente("ADD R2, R0, 0\n")
+    assert len(cache_programas) == PROGRAMAS_EN_CACHE
+    assert primero.source_hash in cache_programas
+    assert segundo.source_hash not in cache_programas
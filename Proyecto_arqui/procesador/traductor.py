@@ -1,9 +1,22 @@
+import os
+import hashlib
+from collections import OrderedDict
+from Programa import Program, PROGRAM_EXTENSION
+
+# Programas ya ensamblados en este proceso, por SHA-256 de la fuente, del
+# menos al más recientemente usado. Se guardan a lo sumo PROGRAMAS_EN_CACHE:
+# el IDE y los barridos ensamblan muchas fuentes distintas en un proceso
+PROGRAMAS_EN_CACHE = 32
+cache_programas = OrderedDict()
+
 # ------------------------------------------------------------------------------
 # Paso 1: Leer y extraer etiquetas
 def leer_asm_con_etiquetas(programa):
     with open(programa, 'r') as archivo:
         lineas = archivo.readlines()
+    return separar_etiquetas(lineas)
 
+def separar_etiquetas(lineas):
     instrucciones = []
     etiquetas = {}
     linea_real = 0
@@ -124,22 +137,54 @@ def traducir_instruccion(instr, etiquetas, pc):
             return opcode + '1' + reg_dest_bin + reg_src1_bin + imm
 
 # ------------------------------------------------------------------------------
-# Ensamblador principal
-def ensamblar(nombre_entrada, nombre_salida):
-    instrucciones, etiquetas = leer_asm_con_etiquetas(nombre_entrada)
-    binarios = []
-
-    for pc, instr in enumerate(instrucciones):
-        binario = traducir_instruccion(instr, etiquetas, pc)
-        binarios.append(binario)
+# Ensamblador principal: devuelve el programa en memoria (Program). Con
+# nombre_salida escribe además el texto '0'/'1' de siempre. Los programas se
+# guardan por SHA-256 de la fuente: volver a ensamblar la misma fuente no
+# traduce ni parsea de nuevo. Con directorio_cache también se reutilizan entre
+# procesos, como archivos empaquetados <hash>.sbo
+def ensamblar(nombre_entrada, nombre_salida=None, directorio_cache=None):
+    with open(nombre_entrada, 'rb') as archivo:
+        fuente = archivo.read()
+    programa = ensamblar_fuente(fuente.decode(), nombre_entrada, directorio_cache)
+
+    if nombre_salida is not None:
+        with open(nombre_salida, 'w') as archivo:
+            for linea in programa.lines:
+                archivo.write(linea + '\n')
+    return programa
+
+def ensamblar_fuente(fuente, nombre=None, directorio_cache=None):
+    clave = hashlib.sha256(fuente.encode()).digest()
+    programa = cache_programas.get(clave)
+    if programa is not None:
+        cache_programas.move_to_end(clave)
+        return programa
+
+    ruta_cache = None
+    if directorio_cache is not None:
+        ruta_cache = os.path.join(directorio_cache, clave.hex() + PROGRAM_EXTENSION)
+        if os.path.exists(ruta_cache):
+            programa = Program.load(ruta_cache, nombre)
+            if programa.source_hash != clave:
+                programa = None
+
+    if programa is None:
+        instrucciones, etiquetas = separar_etiquetas(fuente.splitlines())
+        binarios = [traducir_instruccion(instr, etiquetas, pc)
+                    for pc, instr in enumerate(instrucciones)]
+        programa = Program.from_lines(binarios, nombre, clave)
+        if ruta_cache is not None:
+            # Se escribe aparte y se renombra: otro proceso nunca ve el archivo a medias
+            os.makedirs(directorio_cache, exist_ok=True)
+            temporal = f"{ruta_cache}.{os.getpid()}"
+            programa.save(temporal)
+            os.replace(temporal, ruta_cache)
+
+    cache_programas[clave] = programa
+    if len(cache_programas) > PROGRAMAS_EN_CACHE:
+        cache_programas.popitem(last=False)
+    return programa
 
-    with open(nombre_salida, 'w') as archivo:
-        for linea in binarios:
-            archivo.write(linea + '\n')
-
-# ------------------------------------------------------------------------------
-# Ejecutar
-ensamblar("Proyecto_arqui/procesador/Encriptación.txt", "Proyecto_arqui/procesador/salida.txt")
 
 
 
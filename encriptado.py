@@ -1,9 +1,20 @@
 import struct
 import os
+import mmap
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import numpy as np
+except ImportError:  # sin NumPy se usa la implementación en Python puro
+    np = None
 
 # Constante delta para TEA (derivada del número áureo)
 DELTA = 0x9E3779B9
 
+# Bytes que se procesan por lectura en encrypt_file/decrypt_file (múltiplo de 8)
+CHUNK_SIZE = 8 * 1024 * 1024
+
 def tea_encrypt(v, key):
     v0, v1 = v[0], v[1]
     sum_ = 0
@@ -28,6 +39,63 @@ def tea_decrypt(v, key):
     
     return [v0, v1]
 
+def tea_encrypt_array(v0, v1, key):
+    """
+    Encripta todos los bloques a la vez; v0 y v1 son arreglos uint32 y se
+    modifican en sitio con aritmética de 32 bits que da la vuelta
+    """
+    k0, k1, k2, k3 = (np.uint32(k) for k in key)
+    sum_ = 0
+    
+    for _ in range(32):
+        sum_ = (sum_ + DELTA) & 0xFFFFFFFF
+        s = np.uint32(sum_)
+        v0 += ((v1 << 4) + k0) ^ (v1 + s) ^ ((v1 >> 5) + k1)
+        v1 += ((v0 << 4) + k2) ^ (v0 + s) ^ ((v0 >> 5) + k3)
+    
+    return v0, v1
+
+def tea_decrypt_array(v0, v1, key):
+    """
+    Desencripta todos los bloques a la vez; v0 y v1 son arreglos uint32 y se
+    modifican en sitio con aritmética de 32 bits que da la vuelta
+    """
+    k0, k1, k2, k3 = (np.uint32(k) for k in key)
+    sum_ = (DELTA * 32) & 0xFFFFFFFF
+    
+    for _ in range(32):
+        s = np.uint32(sum_)
+        v1 -= ((v0 << 4) + k2) ^ (v0 + s) ^ ((v0 >> 5) + k3)
+        v0 -= ((v1 << 4) + k0) ^ (v1 + s) ^ ((v1 >> 5) + k1)
+        sum_ = (sum_ - DELTA) & 0xFFFFFFFF
+    
+    return v0, v1
+
+def _process_blocks(data, key, array_func, block_func):
+    """Aplica TEA a un buffer de bloques de 8 bytes ('!2I'), vectorizado si hay NumPy"""
+    if np is not None:
+        blocks = np.frombuffer(data, dtype='>u4').reshape(-1, 2)
+        v0 = blocks[:, 0].astype(np.uint32)
+        v1 = blocks[:, 1].astype(np.uint32)
+        array_func(v0, v1, key)
+        out = np.empty((len(v0), 2), dtype='>u4')
+        out[:, 0] = v0
+        out[:, 1] = v1
+        return out.tobytes()
+    
+    out = bytearray()
+    for v0, v1 in struct.iter_unpack('!2I', data):
+        out += struct.pack('!2I', *block_func([v0, v1], key))
+    return bytes(out)
+
+def encrypt_blocks(data, key):
+    """Encripta un buffer cuyo tamaño es múltiplo de 8 bytes"""
+    return _process_blocks(data, key, tea_encrypt_array, tea_encrypt)
+
+def decrypt_blocks(data, key):
+    """Desencripta un buffer cuyo tamaño es múltiplo de 8 bytes"""
+    return _process_blocks(data, key, tea_decrypt_array, tea_decrypt)
+
 def encrypt_file(input_file, output_file, key):
     """
     Encripta un archivo usando TEA
@@ -42,16 +110,15 @@ def encrypt_file(input_file, output_file, key):
     
     with open(input_file, 'rb') as fin, open(output_file, 'wb') as fout:
         while True:
-            block = fin.read(block_size)
-            if not block:
+            chunk = fin.read(CHUNK_SIZE)
+            if not chunk:
                 break
             
-            if len(block) < block_size:
-                block = block.ljust(block_size, b'\0')
+            # Solo el último trozo puede quedar incompleto
+            if len(chunk) % block_size:
+                chunk = chunk.ljust(len(chunk) + block_size - len(chunk) % block_size, b'\0')
             
-            v0, v1 = struct.unpack('!2I', block)
-            encrypted = tea_encrypt([v0, v1], key)
-            fout.write(struct.pack('!2I', *encrypted))
+            fout.write(encrypt_blocks(chunk, key))
 
 def decrypt_file(input_file, output_file, key):
     """
@@ -67,13 +134,80 @@ def decrypt_file(input_file, output_file, key):
     
     with open(input_file, 'rb') as fin, open(output_file, 'wb') as fout:
         while True:
-            block = fin.read(block_size)
-            if not block:
+            chunk = fin.read(CHUNK_SIZE)
+            if not chunk:
                 break
             
-            v0, v1 = struct.unpack('!2I', block)
-            decrypted = tea_decrypt([v0, v1], key)
-            fout.write(struct.pack('!2I', *decrypted))
+            if len(chunk) % block_size:
+                raise ValueError("El archivo encriptado debe tener un tamaño múltiplo de 8 bytes")
+            
+            fout.write(decrypt_blocks(chunk, key))
+
+def _process_range(input_file, output_file, start, end, key, decrypt):
+    """Procesa los bytes [start, end) de la entrada y los escribe en la misma posición de la salida"""
+    with open(input_file, 'rb') as fin, open(output_file, 'r+b') as fout:
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as in_map, \
+             mmap.mmap(fout.fileno(), 0) as out_map:
+            # El último bloque de la entrada se rellena con ceros como en encrypt_file
+            chunk = in_map[start:min(end, len(in_map))].ljust(end - start, b'\0')
+            process = decrypt_blocks if decrypt else encrypt_blocks
+            out_map[start:end] = process(chunk, key)
+    return end - start
+
+def _process_file_parallel(input_file, output_file, key, decrypt, chunk_size, workers):
+    if len(key) != 4:
+        raise ValueError("La clave debe tener exactamente 4 elementos (128 bits)")
+    if chunk_size <= 0 or chunk_size % 8:
+        raise ValueError("chunk_size debe ser un múltiplo positivo de 8 bytes")
+    
+    start_time = time.perf_counter()
+    input_size = os.path.getsize(input_file)
+    if decrypt and input_size % 8:
+        raise ValueError("El archivo encriptado debe tener un tamaño múltiplo de 8 bytes")
+    output_size = (input_size + 7) // 8 * 8
+    
+    # Salida preasignada: cada proceso escribe su rango directamente
+    with open(output_file, 'wb') as fout:
+        fout.truncate(output_size)
+    
+    ranges = [(i, min(i + chunk_size, output_size)) for i in range(0, output_size, chunk_size)]
+    if workers == 1 or len(ranges) <= 1:
+        for start, end in ranges:
+            _process_range(input_file, output_file, start, end, key, decrypt)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_process_range, input_file, output_file, start, end, key, decrypt)
+                       for start, end in ranges]
+            for future in futures:
+                future.result()
+    
+    seconds = time.perf_counter() - start_time
+    return {
+        "bytes": output_size,
+        "chunks": len(ranges),
+        "seconds": seconds,
+        "throughput_mb_s": output_size / seconds / 1e6 if seconds > 0 else float('inf'),
+    }
+
+def encrypt_file_parallel(input_file, output_file, key, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Encripta un archivo usando TEA, repartiendo rangos de bloques entre procesos.
+    Produce los mismos bytes que encrypt_file
+    :param chunk_size: bytes por rango (múltiplo de 8)
+    :param workers: cantidad de procesos (por defecto, uno por núcleo)
+    :return: diccionario con bytes procesados, segundos y throughput en MB/s
+    """
+    return _process_file_parallel(input_file, output_file, key, False, chunk_size, workers)
+
+def decrypt_file_parallel(input_file, output_file, key, chunk_size=CHUNK_SIZE, workers=None):
+    """
+    Desencripta un archivo usando TEA, repartiendo rangos de bloques entre procesos.
+    Produce los mismos bytes que decrypt_file
+    :param chunk_size: bytes por rango (múltiplo de 8)
+    :param workers: cantidad de procesos (por defecto, uno por núcleo)
+    :return: diccionario con bytes procesados, segundos y throughput en MB/s
+    """
+    return _process_file_parallel(input_file, output_file, key, True, chunk_size, workers)
 
 # Ejemplo de uso
 if __name__ == "__main__":